@@ -40,6 +40,7 @@ hiddenimports = [
     'plotly.graph_objects',
     'plotly.express',
     'pandas',
+    'pyarrow',
     'pymongo',
     'dnspython',
     'bson',
@@ -53,14 +54,28 @@ hiddenimports = [
     'altar_extractor.callbacks.metrics',
     'altar_extractor.callbacks.pygwalker',
     'altar_extractor.callbacks.ui',
+    'altar_extractor.callbacks.indexes',
     'altar_extractor.components',
     'altar_extractor.components.layout',
     'altar_extractor.config',
     'altar_extractor.services',
     'altar_extractor.services.data',
     'altar_extractor.services.mongo',
+    'altar_extractor.services.query',
+    'altar_extractor.services.filters',
+    'altar_extractor.services.frame',
+    'altar_extractor.services.metrics',
+    'altar_extractor.services.downsample',
+    'altar_extractor.services.live',
+    'altar_extractor.services.projection',
+    'altar_extractor.services.indexes',
+    'altar_extractor.services.export',
     'altar_extractor.state',
     'altar_extractor.state.cache',
+    'altar_extractor.state.runs',
+    'altar_extractor.state.metrics_cache',
+    'altar_extractor.state.clients',
+    'altar_extractor.state.exports',
 ]
 
 # Collect all dash submodules
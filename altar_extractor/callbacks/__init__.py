@@ -8,6 +8,7 @@ from .filters import register_filters_callbacks
 from .experiments import register_experiments_callbacks
 from .metrics import register_metrics_callbacks
 from .pygwalker import register_pygwalker
+from .indexes import register_index_callbacks
 
 __all__ = [
     "register_connection_callbacks",
@@ -16,5 +17,6 @@ __all__ = [
     "register_experiments_callbacks",
     "register_metrics_callbacks",
     "register_pygwalker",
+    "register_index_callbacks",
 ]
 
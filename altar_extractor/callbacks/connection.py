@@ -2,19 +2,182 @@
 Connection-related callbacks for AltarExtractor.
 """
 
-from typing import Dict
+from datetime import datetime, timezone
+from typing import Dict, Tuple
 from dash import Input, Output, State, no_update
 import dash
-import pymongo
+import threading
 
-from ..config import DEFAULT_DB_NAME
+from ..config import DEFAULT_DB_NAME, RUNS_BATCH_SIZE, RUNS_REFRESH_EVERY_BATCHES
 from ..services.mongo import (
     build_mongodb_uri,
     fetch_config_keys,
-    fetch_runs_docs,
-    fetch_metrics_values_map,
+    fetch_config_key_stats,
+    fetch_sacred_experiment_names,
+    experiment_scope_query,
+    fetch_runs_batch,
+    count_runs,
+    runs_projection,
+    probe_collections,
+    submit_query,
 )
-from ..services.data import collect_metric_ids_from_runs
+from ..services.data import (
+    collect_metric_names_from_runs,
+    collect_result_keys_from_runs,
+)
+from ..services.filters import pushdown_note
+from ..services.frame import get_config_stats
+from ..services.projection import config_fields_for, session_projection
+from ..services.live import stop_watcher, sync_changed_runs, sync_live_changes, sync_marker
+from ..state.clients import close_unused_client, get_client, release_client
+from ..state.runs import append_runs, create_session, drop_session, get_session, session_handle
+
+
+def loading_status_text(session: Dict) -> str:
+    """Status line for a session that may still be streaming runs."""
+    database_name = session.get("database_name", "")
+    loaded = len(session.get("runs") or [])
+    scope = session.get("experiments") or []
+    scope_text = f" ({len(scope)} experiment(s))" if scope else ""
+    if session.get("done"):
+        return f"Connected. Database '{database_name}'{scope_text} has {loaded} run(s)."
+    status = f"Connected. Loading runs from database '{database_name}'{scope_text}: {loaded} / {session.get('total', 0)}..."
+    note = pushdown_note(session)
+    return f"{status} {note}" if note else status
+
+
+def progress_outputs(session: Dict) -> Tuple:
+    """Values for (runs-load-tick.disabled, progress value, label, style)."""
+    loaded = len(session.get("runs") or [])
+    total = max(int(session.get("total") or 0), loaded, 1)
+    if session.get("done"):
+        return True, 100, "", {"display": "none"}
+    return False, int(100 * loaded / total), f"{loaded} / {total}", {"marginTop": "0.25rem"}
+
+
+def load_runs_batch(session: Dict) -> Tuple:
+    """
+    Append the next batch of runs to a loading session.
+    Returns (handle, runs, refresh); refresh tells whether the handle was bumped.
+    """
+    runs, last_id = fetch_runs_batch(
+        session.get("client"),
+        session.get("database_name"),
+        RUNS_BATCH_SIZE,
+        session.get("last_id"),
+        query=session.get("query"),
+        projection=session_projection(session),
+    )
+    done = last_id is None or len(runs) < RUNS_BATCH_SIZE
+    # Every runs-cache change re-renders the tables; only refresh them every
+    # few batches and once loading finishes
+    pending = int(session.get("pending_batches") or 0) + 1
+    refresh = done or pending >= max(RUNS_REFRESH_EVERY_BATCHES, 1)
+    handle = append_runs(
+        session,
+        runs,
+        bump=refresh,
+        pending_batches=0 if refresh else pending,
+        last_id=last_id if last_id is not None else session.get("last_id"),
+        done=done,
+        total=max(int(session.get("total") or 0), len(session.get("runs") or []) + len(runs)),
+    )
+    get_config_stats(session)
+    return handle, runs, refresh
+
+
+def store_db_config_stats(session: Dict, future) -> None:
+    """Keep the collection-wide config statistics of a finished query on the session."""
+    try:
+        session["db_config_stats"] = future.result()
+    except Exception:
+        pass
+
+
+def merge_store_outputs(session: Dict, runs, config_store, metrics_store, results_store, catalog_keys=()) -> Tuple:
+    """
+    Config keys, metric names and result keys stores extended with new runs
+    and with `catalog_keys` from the config key catalog.
+    """
+    config_store = dict(config_store or {})
+    new_keys = {k for run in runs for k in (run.get("config") or {})} | set(catalog_keys or [])
+    config_store["available"] = sorted(set(config_store.get("available") or []) | new_keys)
+    config_store.setdefault("selected", [])
+    metrics = sorted(set(metrics_store or []) | set(collect_metric_names_from_runs(runs)))
+    results = sorted(set(results_store or []) | set(collect_result_keys_from_runs(runs)))
+    return config_store, metrics, results
+
+
+def resolve_connection(
+    auto_triggered: bool,
+    uri_value: str,
+    host_value: str,
+    port_value: str,
+    username_value: str,
+    password_value: str,
+    auth_source_value: str,
+    db_name_value: str,
+    saved_creds,
+    db_history,
+    connection_mode: str,
+) -> Tuple[str, str]:
+    """Return (MongoDB URI, database name) from the connection form or saved credentials."""
+    # Resolve DB name
+    resolved_db_name = (db_name_value or "").strip()
+    if not resolved_db_name:
+        saved_db_name = ""
+        try:
+            saved_db_name = ((saved_creds or {}).get("db_name") or "").strip() if isinstance(saved_creds, dict) else ""
+        except Exception:
+            saved_db_name = ""
+        if saved_db_name:
+            resolved_db_name = saved_db_name
+        elif db_history and isinstance(db_history, list) and len(db_history) > 0:
+            resolved_db_name = db_history[0]
+        else:
+            resolved_db_name = DEFAULT_DB_NAME
+
+    # Determine connection mode
+    resolved_mode = connection_mode or "credentials"
+    if auto_triggered and saved_creds and isinstance(saved_creds, dict):
+        resolved_mode = saved_creds.get("connection_mode", resolved_mode)
+
+    # Resolve credentials
+    if auto_triggered and saved_creds:
+        uri_from_user = (saved_creds or {}).get("uri") or uri_value
+        host = (saved_creds or {}).get("host") or host_value
+        port = (saved_creds or {}).get("port") or port_value
+        username = (saved_creds or {}).get("username") or username_value
+        password = (saved_creds or {}).get("password") or password_value
+        auth_source = (saved_creds or {}).get("authSource") or auth_source_value
+    else:
+        uri_from_user = uri_value
+        host = host_value
+        port = port_value
+        username = username_value
+        password = password_value
+        auth_source = auth_source_value
+
+    # Apply connection mode
+    if resolved_mode == "uri":
+        host = None
+        port = None
+        username = None
+        password = None
+        auth_source = None
+    else:
+        uri_from_user = None
+
+    uri = build_mongodb_uri(
+        uri_from_user=uri_from_user,
+        host=host,
+        port=port,
+        username=username,
+        password=password,
+        database_name=resolved_db_name,
+        auth_source=auth_source,
+    )
+    return uri, resolved_db_name
 
 
 def register_connection_callbacks(app):
@@ -27,8 +190,12 @@ def register_connection_callbacks(app):
         Output("runs-cache", "data"),
         Output("config-keys-store", "data"),
         Output("metrics-store", "data"),
-        Output("metrics-values-store", "data"),
         Output("results-store", "data"),
+        Output("runs-load-tick", "disabled"),
+        Output("runs-load-progress", "value"),
+        Output("runs-load-progress", "label"),
+        Output("runs-load-progress", "style"),
+        Output("experiment-scope-select", "options"),
         Input("connect-button", "n_clicks"),
         Input("init-tick", "n_intervals"),
         State("uri-input", "value"),
@@ -42,6 +209,8 @@ def register_connection_callbacks(app):
         State("db-history", "data"),
         State("config-keys-store", "data"),
         State("connection-mode-switch", "value"),
+        State("runs-cache", "data"),
+        State("experiment-scope-store", "data"),
         prevent_initial_call=False,
     )
     def on_connect_click(
@@ -58,124 +227,364 @@ def register_connection_callbacks(app):
         db_history,
         existing_config_store,
         connection_mode: str,
+        runs_handle,
+        experiment_scope,
     ):
         ctx = dash.callback_context
         triggered = ctx.triggered[0]["prop_id"].split(".")[0] if ctx.triggered else None
 
         if triggered is None:
-            return "Connecting...", "light", True, no_update, no_update, no_update, no_update, no_update
+            return "Connecting...", "light", True, no_update, no_update, no_update, no_update, no_update, no_update, no_update, no_update, no_update
 
         auto_triggered = (triggered == "init-tick")
 
-        # Resolve DB name
-        resolved_db_name = (db_name_value or "").strip()
-        if not resolved_db_name:
-            saved_db_name = ""
-            try:
-                saved_db_name = ((saved_creds or {}).get("db_name") or "").strip() if isinstance(saved_creds, dict) else ""
-            except Exception:
-                saved_db_name = ""
-            if saved_db_name:
-                resolved_db_name = saved_db_name
-            elif db_history and isinstance(db_history, list) and len(db_history) > 0:
-                resolved_db_name = db_history[0]
-            else:
-                resolved_db_name = DEFAULT_DB_NAME
-
-        # Determine connection mode
-        resolved_mode = connection_mode or "credentials"
-        if auto_triggered and saved_creds and isinstance(saved_creds, dict):
-            resolved_mode = saved_creds.get("connection_mode", resolved_mode)
-
-        # Resolve credentials
-        if auto_triggered and saved_creds:
-            uri_from_user = (saved_creds or {}).get("uri") or uri_value
-            host = (saved_creds or {}).get("host") or host_value
-            port = (saved_creds or {}).get("port") or port_value
-            username = (saved_creds or {}).get("username") or username_value
-            password = (saved_creds or {}).get("password") or password_value
-            auth_source = (saved_creds or {}).get("authSource") or auth_source_value
-        else:
-            uri_from_user = uri_value
-            host = host_value
-            port = port_value
-            username = username_value
-            password = password_value
-            auth_source = auth_source_value
-
-        # Apply connection mode
-        if resolved_mode == "uri":
-            host = None
-            port = None
-            username = None
-            password = None
-            auth_source = None
-        else:
-            uri_from_user = None
-
-        # Build URI and connect
-        uri = build_mongodb_uri(
-            uri_from_user=uri_from_user,
-            host=host,
-            port=port,
-            username=username,
-            password=password,
-            database_name=resolved_db_name,
-            auth_source=auth_source,
+        uri, resolved_db_name = resolve_connection(
+            auto_triggered,
+            uri_value,
+            host_value,
+            port_value,
+            username_value,
+            password_value,
+            auth_source_value,
+            db_name_value,
+            saved_creds,
+            db_history,
+            connection_mode,
         )
+        # Reuses the pooled client when the URI is unchanged, so this is a ping.
+        # Malformed URIs and unresolvable SRV records raise in get_client
+        key = None
         try:
-            client = pymongo.MongoClient(uri, serverSelectionTimeoutMS=5000)
+            key, client = get_client(uri)
             client.admin.command("ping")
         except Exception as exc:
-            return f"Connection failed: {exc}", "danger", True, no_update, no_update, no_update, no_update, no_update
+            release_client(key)
+            return f"Connection failed: {exc}", "danger", True, no_update, no_update, no_update, no_update, no_update, no_update, no_update, no_update, no_update
 
-        # Fetch data
+        # Fetch data: config keys and the first batch of runs; the remaining
+        # batches are streamed in by `load_next_runs_batch`
         try:
-            keys = fetch_config_keys(client, resolved_db_name)
-            runs = fetch_runs_docs(client, resolved_db_name)
-
-            # Compute metric names
-            metric_names = set()
-            for r in runs:
-                m = r.get("metrics", None)
-                if isinstance(m, dict):
-                    for k in m.keys():
-                        if isinstance(k, str) and k.strip():
-                            metric_names.add(k)
-                elif isinstance(m, list):
-                    for item in m:
-                        if isinstance(item, dict):
-                            nm = item.get("name")
-                            if isinstance(nm, str) and nm.strip():
-                                metric_names.add(nm)
-
-            metrics = sorted(metric_names)
-            metric_ids = collect_metric_ids_from_runs(runs)
-            metrics_values_map = fetch_metrics_values_map(client, resolved_db_name, metric_ids)
-
-            # Result keys
-            result_keys = set()
-            for r in runs:
-                res = r.get("result", None)
-                if isinstance(res, dict):
-                    for k in res.keys():
-                        if isinstance(k, str) and k.strip():
-                            result_keys.add(k)
-            results_keys_sorted = sorted(result_keys)
-
-            count = len(runs)
-            status_text = f"Connected. Database '{resolved_db_name}' has {count} run(s)."
-
-            # Preserve selected keys
+            started = datetime.now(timezone.utc)
+            # One collection listing per connect; the queries below reuse it
+            probe_collections(client, resolved_db_name, refresh=True)
+            # Restrict loading to the chosen experiments; names that no longer
+            # exist match no run
+            scope_query = experiment_scope_query(experiment_scope)
+            scope = list((scope_query or {}).get("experiment.name", {}).get("$in", []))
+            # These queries are independent: wait on their round trips together
+            names_future = submit_query(fetch_sacred_experiment_names, client, resolved_db_name)
+            keys_future = submit_query(fetch_config_keys, client, resolved_db_name, scope_query)
+            stats_future = submit_query(fetch_config_key_stats, client, resolved_db_name, query=scope_query)
+            total_future = submit_query(count_runs, client, resolved_db_name, scope_query)
+            # Runs are loaded with the previously selected config keys only
             existing_selected = []
             if existing_config_store and isinstance(existing_config_store, dict):
                 existing_selected = list(existing_config_store.get("selected", []) or [])
+            config_fields = config_fields_for(existing_selected)
+            batch_future = submit_query(
+                fetch_runs_batch,
+                client,
+                resolved_db_name,
+                RUNS_BATCH_SIZE,
+                query=scope_query,
+                projection=runs_projection(config_fields),
+            )
+            keys = keys_future.result()
+            total = total_future.result()
+            runs, last_id = batch_future.result()
+            try:
+                experiment_options = [{"label": name, "value": name} for name in names_future.result()]
+            except Exception:
+                experiment_options = no_update
+            done = last_id is None or len(runs) < RUNS_BATCH_SIZE
+
+            metrics = collect_metric_names_from_runs(runs)
+            results_keys_sorted = collect_result_keys_from_runs(runs)
+
+            # Preserve selected keys
             merged_selected = [k for k in existing_selected if k in set(keys)]
             config_store = {"available": keys, "selected": merged_selected}
 
-            return status_text, "success", True, runs, config_store, metrics, metrics_values_map, results_keys_sorted
+            # Keep runs server-side; the browser only holds the session handle
+            previous = get_session(runs_handle)
+            drop_session(runs_handle)
+            session = create_session(
+                runs,
+                database_name=resolved_db_name,
+                experiments=scope,
+                query=scope_query,
+                client=client,
+                client_key=key,
+                last_id=last_id,
+                synced_at=sync_marker(started),
+                config_fields=config_fields,
+                total=max(total, len(runs)),
+                done=done,
+                load_lock=threading.Lock(),
+                db_config_stats=None,
+            )
+            # The statistics aggregation can take a while; the first batch is
+            # browsable with local statistics until it lands on the session
+            stats_future.add_done_callback(lambda future: store_db_config_stats(session, future))
+            # Credentials changed: close the previous client unless shared
+            stop_watcher(previous)
+            if previous is not None and previous.get("client_key") != key:
+                close_unused_client(previous.get("client_key"))
+            get_config_stats(session)
+            status_text = loading_status_text(session)
+
+            return (
+                status_text, "success", True, session_handle(session), config_store, metrics, results_keys_sorted,
+                *progress_outputs(session),
+                experiment_options,
+            )
         except Exception as exc:
-            return f"Connected, but failed to query runs/config keys: {exc}", "danger", True, no_update, no_update, no_update, no_update, no_update
+            return f"Connected, but failed to query runs/config keys: {exc}", "danger", True, no_update, no_update, no_update, no_update, no_update, no_update, no_update, no_update, no_update
+        finally:
+            # The stored session now keeps the client open
+            release_client(key)
+
+    @app.callback(
+        Output("status-alert", "children", allow_duplicate=True),
+        Output("runs-cache", "data", allow_duplicate=True),
+        Output("metrics-store", "data", allow_duplicate=True),
+        Output("results-store", "data", allow_duplicate=True),
+        Output("runs-load-tick", "disabled", allow_duplicate=True),
+        Output("runs-load-progress", "value", allow_duplicate=True),
+        Output("runs-load-progress", "label", allow_duplicate=True),
+        Output("runs-load-progress", "style", allow_duplicate=True),
+        Input("runs-load-tick", "n_intervals"),
+        State("runs-cache", "data"),
+        State("metrics-store", "data"),
+        State("results-store", "data"),
+        prevent_initial_call=True,
+    )
+    def load_next_runs_batch(n_intervals, runs_handle, metrics_store, results_store):
+        session = get_session(runs_handle)
+        if session is None or session.get("done"):
+            return no_update, no_update, no_update, no_update, True, no_update, no_update, {"display": "none"}
+
+        # Interval ticks can overlap a slow batch; only one loader per session
+        lock = session.get("load_lock")
+        if lock is not None and not lock.acquire(blocking=False):
+            return no_update, no_update, no_update, no_update, no_update, no_update, no_update, no_update
+        try:
+            if session.get("sync_resume_id") is not None:
+                # A refresh matched more than one batch of changed runs
+                handle, runs, _ = sync_changed_runs(session)
+                refresh = True
+            else:
+                handle, runs, refresh = load_runs_batch(session)
+        except Exception as exc:
+            session["done"] = True
+            return f"Failed to load more runs: {exc}", no_update, no_update, no_update, True, no_update, no_update, {"display": "none"}
+        finally:
+            if lock is not None:
+                lock.release()
+
+        metrics = sorted(set(metrics_store or []) | set(collect_metric_names_from_runs(runs)))
+        results = sorted(set(results_store or []) | set(collect_result_keys_from_runs(runs)))
+        return (
+            loading_status_text(session),
+            handle if refresh else no_update,
+            metrics if metrics != sorted(metrics_store or []) else no_update,
+            results if results != sorted(results_store or []) else no_update,
+            *progress_outputs(session),
+        )
+
+    @app.callback(
+        Output("status-alert", "children", allow_duplicate=True),
+        Output("status-alert", "color", allow_duplicate=True),
+        Output("status-alert", "is_open", allow_duplicate=True),
+        Output("runs-cache", "data", allow_duplicate=True),
+        Output("config-keys-store", "data", allow_duplicate=True),
+        Output("metrics-store", "data", allow_duplicate=True),
+        Output("results-store", "data", allow_duplicate=True),
+        Output("runs-load-tick", "disabled", allow_duplicate=True),
+        Input("refresh-button", "n_clicks"),
+        State("runs-cache", "data"),
+        State("config-keys-store", "data"),
+        State("metrics-store", "data"),
+        State("results-store", "data"),
+        prevent_initial_call=True,
+    )
+    def on_refresh_click(n_clicks, runs_handle, config_store, metrics_store, results_store):
+        session = get_session(runs_handle)
+        if not n_clicks or session is None:
+            return "Not connected. Click Connect first.", "warning", True, no_update, no_update, no_update, no_update, no_update
+        if not session.get("done"):
+            return loading_status_text(session), "info", True, no_update, no_update, no_update, no_update, no_update
+
+        lock = session.get("load_lock")
+        if lock is not None and not lock.acquire(blocking=False):
+            return no_update, no_update, no_update, no_update, no_update, no_update, no_update, no_update
+        database_name = session.get("database_name")
+        try:
+            handle, runs, replaced = sync_changed_runs(session)
+        except Exception as exc:
+            return f"Refresh failed: {exc}", "danger", True, no_update, no_update, no_update, no_update, no_update
+        finally:
+            if lock is not None:
+                lock.release()
+
+        added = len(runs) - len(replaced)
+        total = len(session.get("runs") or [])
+        status_text = f"Refreshed: {added} new and {len(replaced)} updated run(s). Database '{database_name}' has {total} run(s)."
+        # More changed runs than one batch: the batch loader fetches the rest
+        loading = not session.get("done")
+        if loading:
+            status_text += " Loading more changed runs..."
+        if not runs:
+            return status_text, "success", True, no_update, no_update, no_update, no_update, no_update
+        # Runs only carry the selected config keys; the catalog only scans new runs.
+        # Live updates skip this round trip; keys show up on the next Refresh
+        try:
+            catalog_keys = fetch_config_keys(session.get("client"), database_name, session.get("query"))
+        except Exception as exc:
+            catalog_keys = []
+            status_text += f" Config keys not updated: {exc}"
+        return (status_text, "success", True, handle, *merge_store_outputs(session, runs, config_store, metrics_store, results_store, catalog_keys), False if loading else no_update)
+
+    @app.callback(
+        Output("live-tick", "disabled"),
+        Input("live-switch", "value"),
+        Input("runs-cache", "data"),
+    )
+    def toggle_live_updates(live_value, runs_handle):
+        enabled = bool(live_value and "live" in live_value)
+        session = get_session(runs_handle)
+        if not enabled:
+            stop_watcher(session)
+        return not (enabled and session is not None)
+
+    @app.callback(
+        Output("runs-cache", "data", allow_duplicate=True),
+        Output("config-keys-store", "data", allow_duplicate=True),
+        Output("metrics-store", "data", allow_duplicate=True),
+        Output("results-store", "data", allow_duplicate=True),
+        Output("metrics-live-store", "data"),
+        Output("runs-load-tick", "disabled", allow_duplicate=True),
+        Output("status-alert", "children", allow_duplicate=True),
+        Output("status-alert", "color", allow_duplicate=True),
+        Output("status-alert", "is_open", allow_duplicate=True),
+        Output("live-tick", "disabled", allow_duplicate=True),
+        Output("live-switch", "value", allow_duplicate=True),
+        Input("live-tick", "n_intervals"),
+        State("runs-cache", "data"),
+        State("config-keys-store", "data"),
+        State("metrics-store", "data"),
+        State("results-store", "data"),
+        prevent_initial_call=True,
+    )
+    def apply_live_updates(n_intervals, runs_handle, config_store, metrics_store, results_store):
+        # Outputs after the stores: runs-load-tick.disabled, then the status
+        # alert and the live switch, only touched when live updates fail
+        unchanged = (no_update,) * 5
+        session = get_session(runs_handle)
+        if session is None or not session.get("done"):
+            return (no_update,) * 6 + unchanged
+
+        lock = session.get("load_lock")
+        if lock is not None and not lock.acquire(blocking=False):
+            return (no_update,) * 6 + unchanged
+        try:
+            handle, runs, replaced, metrics_changed = sync_live_changes(session)
+        except Exception as exc:
+            # Stop ticking instead of failing silently on every interval
+            stop_watcher(session)
+            return (no_update,) * 6 + (f"Live update failed: {exc}", "danger", True, True, [])
+        finally:
+            if lock is not None:
+                lock.release()
+
+        if handle is None:
+            # New metric points only: just the metric steps table refetches its series
+            if metrics_changed:
+                return no_update, no_update, no_update, no_update, {"token": session.get("token"), "n": n_intervals}, no_update, *unchanged
+            return (no_update,) * 6 + unchanged
+        # More changed runs than one batch: the batch loader fetches the rest
+        load_tick = False if not session.get("done") else no_update
+        if not runs:
+            return handle, no_update, no_update, no_update, no_update, load_tick, *unchanged
+        return (handle, *merge_store_outputs(session, runs, config_store, metrics_store, results_store), no_update, load_tick, *unchanged)
+
+    @app.callback(
+        Output("experiment-scope-select", "options", allow_duplicate=True),
+        Output("status-alert", "children", allow_duplicate=True),
+        Output("status-alert", "color", allow_duplicate=True),
+        Output("status-alert", "is_open", allow_duplicate=True),
+        Input("experiment-list-button", "n_clicks"),
+        State("uri-input", "value"),
+        State("host-input", "value"),
+        State("port-input", "value"),
+        State("username-input", "value"),
+        State("password-input", "value"),
+        State("authsource-input", "value"),
+        State("db-name-input", "value"),
+        State("creds-store", "data"),
+        State("db-history", "data"),
+        State("connection-mode-switch", "value"),
+        prevent_initial_call=True,
+    )
+    def list_experiment_names(
+        n_clicks,
+        uri_value,
+        host_value,
+        port_value,
+        username_value,
+        password_value,
+        auth_source_value,
+        db_name_value,
+        saved_creds,
+        db_history,
+        connection_mode,
+    ):
+        # Names only, so experiments can be picked before any run is loaded
+        if not n_clicks:
+            return no_update, no_update, no_update, no_update
+        uri, resolved_db_name = resolve_connection(
+            False,
+            uri_value,
+            host_value,
+            port_value,
+            username_value,
+            password_value,
+            auth_source_value,
+            db_name_value,
+            saved_creds,
+            db_history,
+            connection_mode,
+        )
+        key = None
+        try:
+            key, client = get_client(uri)
+            names = fetch_sacred_experiment_names(client, resolved_db_name)
+        except Exception as exc:
+            return no_update, f"Failed to list experiments: {exc}", "danger", True
+        finally:
+            release_client(key)
+        status_text = f"Database '{resolved_db_name}' has {len(names)} experiment(s). Pick some and click Connect to load their runs."
+        return [{"label": name, "value": name} for name in names], status_text, "info", True
+
+    @app.callback(
+        Output("experiment-scope-store", "data", allow_duplicate=True),
+        Input("experiment-scope-select", "value"),
+        prevent_initial_call=True,
+    )
+    def persist_experiment_scope(selected_names):
+        return list(selected_names or [])
+
+    @app.callback(
+        Output("experiment-scope-select", "value"),
+        Input("experiment-scope-select", "options"),
+        State("experiment-scope-store", "data"),
+        prevent_initial_call=True,
+    )
+    def restore_experiment_scope(options, saved_names):
+        if not options:
+            return no_update
+        available = set(opt.get("value") for opt in (options or []) if isinstance(opt, dict))
+        return [n for n in (saved_names or []) if n in available]
 
     @app.callback(
         Output("creds-store", "data"),
@@ -2,14 +2,32 @@
 Experiments table callbacks for AltarExtractor.
 """
 
-from typing import Dict
-from dash import dcc, Input, Output, State, no_update
-import json
-import random
-import io
-import csv
-
-from ..services.data import build_table_from_runs
+from typing import Dict, List
+from dash import Input, Output, State, no_update
+from dash.dependencies import ClientsideFunction
+from flask import request
+
+from ..services.data import build_table_from_runs, add_result_columns
+from ..services.export import csv_filename, csv_response, experiments_table
+from ..services.filters import filter_runs
+from ..services.query import query_experiment_runs, paginate
+from ..state.exports import get_export, register_export
+from ..state.runs import get_session
+
+
+def experiments_view(runs_cache, config_store, filters_store, random_store, sort_by, filter_query) -> List[Dict]:
+    """
+    Return the runs listed by the experiments table, filtered and in display order.
+    """
+    session = get_session(runs_cache) or {}
+    selected = (config_store or {}).get("selected", [])
+    filtered_runs = filter_runs(session, filters_store or {}, selected)
+    try:
+        random_enabled = bool(random_store)
+    except Exception:
+        random_enabled = False
+    random_seed = session.get("token") if random_enabled else None
+    return query_experiment_runs(filtered_runs, random_seed, sort_by, filter_query)
 
 
 def register_experiments_callbacks(app):
@@ -18,102 +36,28 @@ def register_experiments_callbacks(app):
     @app.callback(
         Output("experiments-table", "columns"),
         Output("experiments-table", "data"),
+        Output("experiments-table", "page_count"),
+        Output("experiments-table", "page_current"),
         Input("runs-cache", "data"),
         Input("config-keys-store", "data"),
         Input("filters-store", "data"),
         Input("results-select", "value"),
         Input("experiments-random-store", "data"),
+        Input("experiments-table", "page_current"),
+        Input("experiments-table", "page_size"),
+        Input("experiments-table", "sort_by"),
+        Input("experiments-table", "filter_query"),
     )
-    def refresh_table(runs_cache, config_store, filters_store, selected_result_keys, random_store):
-        runs = runs_cache or []
+    def refresh_table(runs_cache, config_store, filters_store, selected_result_keys, random_store, page_current, page_size, sort_by, filter_query):
         selected = (config_store or {}).get("selected", [])
-        active_filters = filters_store or {}
-
-        def row_passes_filters(run_cfg: Dict) -> bool:
-            for key in selected:
-                f = active_filters.get(key) if isinstance(active_filters, dict) else None
-                if not f:
-                    continue
-                value = run_cfg.get(key, None) if isinstance(run_cfg, dict) else None
-
-                mode = f.get("mode") if isinstance(f, dict) else None
-                if mode in ("true", "false"):
-                    if not isinstance(value, bool):
-                        return False
-                    desired = (mode == "true")
-                    if value != desired:
-                        return False
-
-                has_min = "min" in f and f.get("min") is not None
-                has_max = "max" in f and f.get("max") is not None
-                if has_min or has_max:
-                    if not isinstance(value, (int, float)) or isinstance(value, bool):
-                        return False
-                    if has_min and value < f.get("min"):
-                        return False
-                    if has_max and value > f.get("max"):
-                        return False
-
-                values = f.get("values") if isinstance(f, dict) else None
-                if isinstance(values, list) and len(values) > 0:
-                    if not isinstance(value, str):
-                        return False
-                    if value not in values:
-                        return False
-            return True
-
-        filtered_runs = [run for run in runs if row_passes_filters(run.get("config", {}) or {})]
-
-        try:
-            random_enabled = bool(random_store)
-        except Exception:
-            random_enabled = False
-
-        if random_enabled and len(filtered_runs) > 1:
-            random.shuffle(filtered_runs)
-        else:
-            def run_id_sort_key(run: Dict):
-                rid = str(run.get("run_id", ""))
-                try:
-                    return int(rid)
-                except Exception:
-                    pass
-                try:
-                    if len(rid) == 24:
-                        return int(rid, 16)
-                except Exception:
-                    pass
-                return rid
-            try:
-                filtered_runs.sort(key=run_id_sort_key)
-            except Exception:
-                pass
-
-        columns, rows = build_table_from_runs(filtered_runs, selected)
-
         result_keys = [k for k in (selected_result_keys or []) if isinstance(k, str) and k.strip()]
-        if len(result_keys) > 0:
-            for key in result_keys:
-                columns.append({"name": key, "id": f"result:{key}"})
-            for idx, run in enumerate(filtered_runs):
-                if idx >= len(rows):
-                    continue
-                r = run.get("result", None)
-                if not isinstance(r, dict) or len(r) == 0:
-                    for key in result_keys:
-                        rows[idx][f"result:{key}"] = ""
-                else:
-                    for key in result_keys:
-                        val = r.get(key, None)
-                        if val is None:
-                            rows[idx][f"result:{key}"] = ""
-                        else:
-                            try:
-                                rows[idx][f"result:{key}"] = json.dumps(val, ensure_ascii=False, default=str) if isinstance(val, (list, dict)) else val
-                            except Exception:
-                                rows[idx][f"result:{key}"] = str(val)
-
-        return columns, rows
+        view = experiments_view(runs_cache, config_store, filters_store, random_store, sort_by, filter_query)
+
+        # Only the visible page is turned into rows and sent to the browser
+        page_runs, page_current, page_count = paginate(view, page_current, page_size)
+        columns, rows = build_table_from_runs(page_runs, selected)
+        add_result_columns(columns, rows, page_runs, result_keys)
+        return columns, rows, page_count, page_current
 
     @app.callback(
         Output("download-exp-modal", "is_open"),
@@ -126,46 +70,62 @@ def register_experiments_callbacks(app):
     def toggle_download_exp_modal(open_clicks, cancel_clicks, confirm_clicks, is_open):
         return not is_open
 
+    # Streams the CSV export recorded by download_exp_csv
+    @app.server.route("/download/experiments.csv")
+    def download_experiments_route():
+        spec = get_export(request.args.get("id", "").strip())
+        if not spec or spec.get("kind") != "experiments" or get_session(spec.get("runs_cache")) is None:
+            return "Export not found or expired", 404
+        view = experiments_view(
+            spec.get("runs_cache"),
+            spec.get("config_store"),
+            spec.get("filters_store"),
+            spec.get("random_store"),
+            spec.get("sort_by"),
+            spec.get("filter_query"),
+        )
+        selected = (spec.get("config_store") or {}).get("selected", [])
+        columns, rows = experiments_table(view, selected, spec.get("result_keys") or [])
+        return csv_response(columns, rows, spec.get("filename"))
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="download", function_name="start"),
+        Output("download-exp-start-dummy", "children"),
+        Input("download-exp-url", "data"),
+    )
+
     @app.callback(
-        Output("download-exp-csv", "data"),
+        Output("download-exp-url", "data"),
         Input("download-exp-confirm", "n_clicks"),
         State("download-exp-filename", "value"),
-        State("experiments-table", "columns"),
-        State("experiments-table", "data"),
+        State("runs-cache", "data"),
+        State("config-keys-store", "data"),
+        State("filters-store", "data"),
+        State("results-select", "value"),
+        State("experiments-random-store", "data"),
+        State("experiments-table", "sort_by"),
+        State("experiments-table", "filter_query"),
         prevent_initial_call=True,
     )
-    def download_exp_csv(n_clicks, filename, columns, data_rows):
-        if not n_clicks:
+    def download_exp_csv(n_clicks, filename, runs_cache, config_store, filters_store, selected_result_keys, random_store, sort_by, filter_query):
+        if not n_clicks or get_session(runs_cache) is None:
             return no_update
-        rows = data_rows or []
-        cols = columns or []
-        if len(rows) == 0 or len(cols) == 0:
+        if not experiments_view(runs_cache, config_store, filters_store, random_store, sort_by, filter_query):
             return no_update
-
-        col_ids = [c.get("id") for c in cols if isinstance(c, dict) and c.get("id")]
-        col_names = [c.get("name", c.get("id")) for c in cols]
-
-        buf = io.StringIO()
-        writer = csv.writer(buf)
-        writer.writerow(col_names)
-
-        def stringify(v):
-            if isinstance(v, (list, dict, tuple)):
-                try:
-                    return json.dumps(v, ensure_ascii=False, default=str)
-                except Exception:
-                    return str(v)
-            return v
-
-        for row in rows:
-            writer.writerow([stringify(row.get(cid, "")) for cid in col_ids])
-
-        csv_str = buf.getvalue()
-        buf.close()
-        safe_name = (filename or "").strip() or "experiments.csv"
-        if not safe_name.lower().endswith(".csv"):
-            safe_name += ".csv"
-        return dcc.send_string(csv_str, safe_name)
+        # Only the export options travel through the callback; the route
+        # builds the rows from the run store and streams them
+        export_id = register_export({
+            "kind": "experiments",
+            "runs_cache": runs_cache,
+            "config_store": config_store,
+            "filters_store": filters_store,
+            "result_keys": [k for k in (selected_result_keys or []) if isinstance(k, str) and k.strip()],
+            "random_store": random_store,
+            "sort_by": sort_by,
+            "filter_query": filter_query,
+            "filename": csv_filename(filename, "experiments.csv"),
+        })
+        return f"/download/experiments.csv?id={export_id}"
 
     @app.callback(
         Output("experiments-table", "page_size"),
@@ -8,6 +8,9 @@ import dash
 import dash_bootstrap_components as dbc
 import json
 
+from ..services.frame import get_config_stats
+from ..state.runs import get_session
+
 
 def register_filters_callbacks(app):
     """Register filter-related callbacks."""
@@ -27,59 +30,9 @@ def register_filters_callbacks(app):
         selected = data.get("selected", []) or []
         all_keys = sorted(set(list(available) + list(selected)))
 
-        runs = runs_cache or []
-
-        def type_name_for_value(value):
-            if value is None:
-                return None
-            if isinstance(value, bool):
-                return "boolean"
-            if isinstance(value, (int, float)) and not isinstance(value, bool):
-                return "number"
-            if isinstance(value, str):
-                return "string"
-            if isinstance(value, list):
-                return "list"
-            if isinstance(value, dict):
-                return "dict"
-            return "unknown"
-
-        key_to_type: Dict[str, str] = {}
-        for key in all_keys:
-            seen_types = set()
-            for run in runs:
-                cfg = run.get("config", {}) or {}
-                if isinstance(cfg, dict) and key in cfg:
-                    t = type_name_for_value(cfg.get(key))
-                    if t is not None:
-                        seen_types.add(t)
-                if len(seen_types) > 1:
-                    break
-            if len(seen_types) == 0:
-                key_to_type[key] = "unknown"
-            elif len(seen_types) == 1:
-                key_to_type[key] = next(iter(seen_types))
-            else:
-                key_to_type[key] = "mixed"
-
-        def encode_for_set(value):
-            try:
-                return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
-            except Exception:
-                return str(value)
-
-        key_to_value_count: Dict[str, int] = {}
-        for key in all_keys:
-            distinct = set()
-            for run in runs:
-                cfg = run.get("config", {}) or {}
-                if not isinstance(cfg, dict):
-                    continue
-                v = cfg.get(key, None)
-                if v is None:
-                    continue
-                distinct.add(encode_for_set(v))
-            key_to_value_count[key] = len(distinct)
+        stats = get_config_stats(get_session(runs_cache) or {})
+        key_to_type: Dict[str, str] = {k: stats.get(k, {}).get("type", "unknown") for k in all_keys}
+        key_to_value_count: Dict[str, int] = {k: stats.get(k, {}).get("count", 0) for k in all_keys}
 
         options = [{"label": f"{k} ({key_to_type.get(k, 'unknown')} {key_to_value_count.get(k, 0)})", "value": k} for k in all_keys]
         if len(options) == 0:
@@ -115,73 +68,18 @@ def register_filters_callbacks(app):
         store = config_store or {"available": [], "selected": []}
         available = store.get("available", []) or []
         selected = store.get("selected", []) or []
-        runs = runs_cache or []
         keys_to_check = set(list(available) + list(selected))
 
-        def type_name_for_value(value):
-            if value is None:
-                return None
-            if isinstance(value, bool):
-                return "boolean"
-            if isinstance(value, (int, float)) and not isinstance(value, bool):
-                return "number"
-            if isinstance(value, str):
-                return "string"
-            if isinstance(value, list):
-                return "list"
-            if isinstance(value, dict):
-                return "dict"
-            return "unknown"
-
-        key_to_type: Dict[str, str] = {}
-        for key in keys_to_check:
-            seen_types = set()
-            for run in runs:
-                cfg = run.get("config", {}) or {}
-                if isinstance(cfg, dict) and key in cfg:
-                    t = type_name_for_value(cfg.get(key))
-                    if t is not None:
-                        seen_types.add(t)
-                if len(seen_types) > 1:
-                    break
-            if len(seen_types) == 0:
-                key_to_type[key] = "unknown"
-            elif len(seen_types) == 1:
-                key_to_type[key] = next(iter(seen_types))
-            else:
-                key_to_type[key] = "mixed"
-
-        def encode_for_set(value):
-            try:
-                return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
-            except Exception:
-                return str(value)
-
-        key_to_str_values: Dict[str, list] = {}
-        key_to_value_count: Dict[str, int] = {}
+        # Types, distinct counts and string values come from the config frame
+        # statistics built when the runs were loaded
+        stats = get_config_stats(get_session(runs_cache) or {})
+        key_to_type: Dict[str, str] = {k: stats.get(k, {}).get("type", "unknown") for k in keys_to_check}
+        key_to_value_count: Dict[str, int] = {k: stats.get(k, {}).get("count", 0) for k in keys_to_check}
+        key_to_str_values: Dict[str, list] = {k: stats[k]["strings"] for k in selected if stats.get(k, {}).get("strings")}
 
-        for key in selected:
-            values = set()
-            for run in runs:
-                cfg = run.get("config", {}) or {}
-                if isinstance(cfg, dict):
-                    v = cfg.get(key)
-                    if isinstance(v, str):
-                        values.add(v)
-            if values:
-                key_to_str_values[key] = sorted(values)
-
-        for key in keys_to_check:
-            distinct = set()
-            for run in runs:
-                cfg = run.get("config", {}) or {}
-                if not isinstance(cfg, dict):
-                    continue
-                v = cfg.get(key, None)
-                if v is None:
-                    continue
-                distinct.add(encode_for_set(v))
-            key_to_value_count[key] = len(distinct)
+        def range_placeholder(bound: str, key: str) -> str:
+            value = stats.get(key, {}).get(bound)
+            return f"{bound} ({value:g})" if isinstance(value, (int, float)) and not isinstance(value, bool) else bound
 
         available_children = [
             dbc.ListGroupItem(
@@ -216,8 +114,8 @@ def register_filters_callbacks(app):
             elif ktype == "number":
                 control = dbc.Row(
                     [
-                        dbc.Col(dcc.Input(id={"type": "filter-number-min", "key": key}, type="number", placeholder="min", value=current.get("min", None), style={"width": "100%"}), md=6),
-                        dbc.Col(dcc.Input(id={"type": "filter-number-max", "key": key}, type="number", placeholder="max", value=current.get("max", None), style={"width": "100%"}), md=6),
+                        dbc.Col(dcc.Input(id={"type": "filter-number-min", "key": key}, type="number", placeholder=range_placeholder("min", key), value=current.get("min", None), style={"width": "100%"}), md=6),
+                        dbc.Col(dcc.Input(id={"type": "filter-number-max", "key": key}, type="number", placeholder=range_placeholder("max", key), value=current.get("max", None), style={"width": "100%"}), md=6),
                     ],
                     class_name="g-2",
                 )
@@ -0,0 +1,91 @@
+"""
+Index advisor callbacks for AltarExtractor.
+"""
+
+from typing import Dict, List
+from dash import html, Input, Output, State, no_update
+import dash
+import dash_bootstrap_components as dbc
+
+from ..services.filters import active_filter_items
+from ..services.indexes import index_build_status, index_report, start_index_build
+from ..state.runs import get_session
+
+
+def render_index_report(rows: List[Dict], note: str = ""):
+    """Render index advisor rows as a small table."""
+    header = html.Thead(html.Tr([html.Th("Collection"), html.Th("Index"), html.Th("Status"), html.Th("Query plan"), html.Th("Used for")]))
+    body = html.Tbody([
+        html.Tr([
+            html.Td(row["collection"]),
+            html.Td(html.Code(row["index"])),
+            html.Td(dbc.Badge("present", color="success") if row["exists"] else dbc.Badge("missing", color="warning")),
+            html.Td(html.Code(row["plan"])),
+            html.Td(row["purpose"]),
+        ])
+        for row in rows
+    ])
+    children = []
+    if note:
+        children.append(html.Div(note, className="mb-2"))
+    children.append(dbc.Table([header, body], bordered=False, hover=True, size="sm", responsive=True, class_name="mb-0"))
+    return children
+
+
+def index_build_note(status: Dict) -> str:
+    """Progress line of a background index build."""
+    created = status.get("created") or []
+    if status.get("error"):
+        return f"Index build failed after {len(created)} of {status.get('total', 0)} index(es): {status['error']}"
+    if status.get("finished"):
+        if not status.get("total"):
+            return "All recommended indexes already exist."
+        return f"Created {len(created)} index(es): {', '.join(created)}"
+    return f"Building indexes: {len(created)} of {status.get('total', 0)} done, now {status.get('current') or '...'}"
+
+
+def register_index_callbacks(app):
+    """Register index advisor callbacks."""
+
+    @app.callback(
+        Output("index-report", "children"),
+        Output("index-build-status", "children"),
+        Output("index-build-tick", "disabled"),
+        Input("index-check-button", "n_clicks"),
+        Input("index-create-confirm", "submit_n_clicks"),
+        Input("index-build-tick", "n_intervals"),
+        State("runs-cache", "data"),
+        State("config-keys-store", "data"),
+        State("filters-store", "data"),
+        prevent_initial_call=True,
+    )
+    def update_index_report(check_clicks, create_clicks, n_intervals, runs_cache, config_store, filters_store):
+        ctx = dash.callback_context
+        if not ctx.triggered:
+            return no_update, no_update, no_update
+        trigger_id = ctx.triggered[0]["prop_id"].split(".")[0]
+
+        session = get_session(runs_cache)
+        if session is None or session.get("client") is None:
+            return dbc.Alert("Connect to a database first.", color="light", class_name="mb-0"), "", True
+        client = session.get("client")
+        database_name = session.get("database_name")
+        selected = (config_store or {}).get("selected", [])
+        filtered_keys = [key for key, _ in active_filter_items(filters_store or {}, selected)]
+
+        try:
+            # Index builds can take minutes on large collections; they run in
+            # the background and the interval polls their progress
+            if trigger_id == "index-create-confirm":
+                status = start_index_build(client, database_name, filtered_keys)
+            else:
+                status = index_build_status(client, database_name)
+            if status is not None and not status["finished"]:
+                return no_update, index_build_note(status), False
+            if trigger_id == "index-build-tick" and status is None:
+                return no_update, "", True
+            note = index_build_note(status) if status is not None and trigger_id != "index-check-button" else ""
+            rows = index_report(client, database_name, filtered_keys)
+        except Exception as exc:
+            return dbc.Alert(f"Index check failed: {exc}", color="danger", class_name="mb-0"), "", True
+        return render_index_report(rows), note, True
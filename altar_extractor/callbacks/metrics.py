@@ -2,12 +2,48 @@
 Metrics table callbacks for AltarExtractor.
 """
 
-from typing import Dict, List
-from dash import dcc, Input, Output, State, no_update
-from bson import ObjectId
-import json
-import io
-import csv
+from typing import Callable, Dict, List, Tuple
+from dash import Input, Output, State, no_update
+from dash.dependencies import ClientsideFunction
+from flask import request
+
+from ..services.filters import filter_runs
+from ..services.downsample import DOWNSAMPLE_MODES
+from ..services.export import EXPORT_CHUNK_ROWS, csv_filename, csv_response
+from ..services.metrics import ensure_metric_values, iter_column_rows, metric_ids_for_runs, metrics_steps_table
+from ..services.query import paginate
+from ..state.exports import get_export, register_export
+from ..state.runs import get_session
+
+
+def metrics_steps_view(
+    session: Dict,
+    config_store,
+    filters_store,
+    selected_metrics_names,
+    show_keys_switch,
+    layout_mode,
+    downsample_mode,
+    downsample_points,
+) -> Tuple[List[Dict], int, Callable[..., Dict[str, List]]]:
+    """
+    Return (columns, row_count, column_range) of the metric steps table for the
+    current filters and table options, as from `metrics_steps_table`.
+    """
+    selected = (config_store or {}).get("selected", [])
+    selected_metrics = [m for m in (selected_metrics_names or []) if isinstance(m, str) and m.strip()]
+    show_selected_keys = bool(show_keys_switch and "show" in show_keys_switch)
+    filtered_runs = filter_runs(session, filters_store or {}, selected)
+    metrics_values_map = ensure_metric_values(session, filtered_runs, selected_metrics, downsample_mode, downsample_points)
+    return metrics_steps_table(
+        filtered_runs,
+        metrics_values_map,
+        selected_metrics,
+        selected if show_selected_keys else [],
+        layout_mode == "cols",
+        downsample_mode,
+        downsample_points,
+    )
 
 
 def register_metrics_callbacks(app):
@@ -16,149 +52,28 @@ def register_metrics_callbacks(app):
     @app.callback(
         Output("metrics-steps-table", "columns"),
         Output("metrics-steps-table", "data"),
+        Output("metrics-steps-table", "page_count"),
+        Output("metrics-steps-table", "page_current"),
         Input("runs-cache", "data"),
         Input("config-keys-store", "data"),
         Input("filters-store", "data"),
         Input("metrics-select", "value"),
-        Input("metrics-values-store", "data"),
         Input("metrics-show-keys-switch", "value"),
         Input("metrics-layout-mode", "value"),
+        Input("metrics-downsample-mode", "value"),
+        Input("metrics-downsample-points", "value"),
+        Input("metrics-steps-table", "page_current"),
+        Input("metrics-steps-table", "page_size"),
+        Input("metrics-live-store", "data"),
     )
-    def refresh_metrics_steps_table(runs_cache, config_store, filters_store, selected_metrics_names, metrics_values_map, show_keys_switch, layout_mode):
-        runs = runs_cache or []
-        selected = (config_store or {}).get("selected", [])
-        metrics_values_map = metrics_values_map or {}
-        selected_metrics = [m for m in (selected_metrics_names or []) if isinstance(m, str) and m.strip()]
-        show_selected_keys = bool(show_keys_switch and "show" in show_keys_switch)
-        steps_as_columns = (layout_mode == "cols")
-
-        active_filters = filters_store or {}
-
-        def row_passes_filters(run_cfg: Dict) -> bool:
-            for key in selected:
-                f = active_filters.get(key) if isinstance(active_filters, dict) else None
-                if not f:
-                    continue
-                value = run_cfg.get(key, None) if isinstance(run_cfg, dict) else None
-
-                mode = f.get("mode") if isinstance(f, dict) else None
-                if mode in ("true", "false"):
-                    if not isinstance(value, bool):
-                        return False
-                    desired = (mode == "true")
-                    if value != desired:
-                        return False
-
-                has_min = "min" in f and f.get("min") is not None
-                has_max = "max" in f and f.get("max") is not None
-                if has_min or has_max:
-                    if not isinstance(value, (int, float)) or isinstance(value, bool):
-                        return False
-                    if has_min and value < f.get("min"):
-                        return False
-                    if has_max and value > f.get("max"):
-                        return False
-
-                values = f.get("values") if isinstance(f, dict) else None
-                if isinstance(values, list) and len(values) > 0:
-                    if not isinstance(value, str):
-                        return False
-                    if value not in values:
-                        return False
-            return True
-
-        filtered_runs = [run for run in runs if row_passes_filters(run.get("config", {}) or {})]
-
-        def extract_metric_id_for_run(run_metrics, metric_name):
-            if isinstance(run_metrics, dict):
-                v = run_metrics.get(metric_name, None)
-                if isinstance(v, dict) and v.get("id") is not None:
-                    return str(v.get("id"))
-                if isinstance(v, (str, ObjectId)):
-                    return str(v)
-                return None
-            if isinstance(run_metrics, list):
-                for item in run_metrics:
-                    if isinstance(item, dict) and item.get("name") == metric_name:
-                        mid = item.get("id") or item.get("_id")
-                        if mid is not None:
-                            return str(mid)
-                        return None
-            return None
-
-        run_data = []
-        all_step_values = set()
-        for run in filtered_runs:
-            base = {"run_id": run.get("run_id", ""), "experiment": run.get("experiment", "")}
-            cfg = run.get("config", {}) or {}
-            if show_selected_keys:
-                for key in selected:
-                    base[key] = cfg.get(key)
-
-            run_metrics = run.get("metrics", None)
-            step_grid = None
-            metric_series: Dict[str, List] = {}
-            metric_steps: Dict[str, List] = {}
-            for mname in selected_metrics:
-                mid = extract_metric_id_for_run(run_metrics, mname)
-                payload = metrics_values_map.get(str(mid), {}) if mid else {}
-                values = payload.get("values") or []
-                steps = payload.get("steps") or list(range(len(values)))
-                metric_series[mname] = values
-                metric_steps[mname] = steps
-                for s in steps:
-                    all_step_values.add(s)
-                if steps and (step_grid is None or len(steps) > len(step_grid)):
-                    step_grid = steps
-            if step_grid is None:
-                continue
-            run_data.append({"base": base, "step_grid": step_grid, "metric_series": metric_series, "metric_steps": metric_steps})
-
-        sorted_steps = sorted(all_step_values)
-        rows: List[Dict] = []
-
-        if steps_as_columns:
-            columns = [{"name": "run_id", "id": "run_id"}, {"name": "Experiment", "id": "experiment"}]
-            if show_selected_keys:
-                columns += [{"name": key, "id": key} for key in selected]
-            columns.append({"name": "Metric", "id": "metric_name"})
-            for step_val in sorted_steps:
-                columns.append({"name": str(step_val), "id": f"step:{step_val}"})
-
-            for rd in run_data:
-                base = rd["base"]
-                metric_series = rd["metric_series"]
-                metric_steps = rd["metric_steps"]
-                for mname in selected_metrics:
-                    row = dict(base)
-                    row["metric_name"] = mname
-                    series = metric_series.get(mname, [])
-                    steps = metric_steps.get(mname, [])
-                    step_to_value = {s: v for s, v in zip(steps, series)}
-                    for step_val in sorted_steps:
-                        row[f"step:{step_val}"] = step_to_value.get(step_val, "")
-                    rows.append(row)
-        else:
-            columns = [{"name": "run_id", "id": "run_id"}, {"name": "Experiment", "id": "experiment"}]
-            if show_selected_keys:
-                columns += [{"name": key, "id": key} for key in selected]
-            columns.append({"name": "Step", "id": "step"})
-            for mname in selected_metrics:
-                columns.append({"name": mname, "id": f"metric:{mname}"})
-
-            for rd in run_data:
-                base = rd["base"]
-                step_grid = rd["step_grid"]
-                metric_series = rd["metric_series"]
-                for idx, step in enumerate(step_grid):
-                    row = dict(base)
-                    row["step"] = step
-                    for mname in selected_metrics:
-                        series = metric_series.get(mname, [])
-                        row[f"metric:{mname}"] = series[idx] if idx < len(series) else ""
-                    rows.append(row)
-
-        return columns, rows
+    def refresh_metrics_steps_table(runs_cache, config_store, filters_store, selected_metrics_names, show_keys_switch, layout_mode, downsample_mode, downsample_points, page_current, page_size, metrics_live):
+        session = get_session(runs_cache) or {}
+        columns, row_count, column_range = metrics_steps_view(
+            session, config_store, filters_store, selected_metrics_names, show_keys_switch, layout_mode, downsample_mode, downsample_points,
+        )
+        # Only the visible page is turned into rows and sent to the browser
+        page_rows, page_current, page_count = paginate(range(row_count), page_current, page_size)
+        return columns, list(iter_column_rows(column_range, page_rows.start, page_rows.stop)), page_count, page_current
 
     @app.callback(
         Output("download-steps-modal", "is_open"),
@@ -171,46 +86,72 @@ def register_metrics_callbacks(app):
     def toggle_download_steps_modal(open_clicks, cancel_clicks, confirm_clicks, is_open):
         return not is_open
 
+    # Streams the CSV export recorded by download_steps_csv
+    @app.server.route("/download/metrics_steps.csv")
+    def download_metrics_steps_route():
+        spec = get_export(request.args.get("id", "").strip())
+        if not spec or spec.get("kind") != "metrics_steps":
+            return "Export not found or expired", 404
+        session = get_session(spec.get("runs_cache"))
+        if session is None:
+            return "Export not found or expired", 404
+        columns, row_count, column_range = metrics_steps_view(
+            session,
+            spec.get("config_store"),
+            spec.get("filters_store"),
+            spec.get("metrics"),
+            spec.get("show_keys_switch"),
+            spec.get("layout_mode"),
+            spec.get("downsample_mode"),
+            spec.get("downsample_points"),
+        )
+        return csv_response(columns, iter_column_rows(column_range, 0, row_count, EXPORT_CHUNK_ROWS), spec.get("filename"))
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="download", function_name="start"),
+        Output("download-steps-start-dummy", "children"),
+        Input("download-steps-url", "data"),
+    )
+
     @app.callback(
-        Output("download-steps-csv", "data"),
+        Output("download-steps-url", "data"),
         Input("download-steps-confirm", "n_clicks"),
         State("download-steps-filename", "value"),
-        State("metrics-steps-table", "columns"),
-        State("metrics-steps-table", "data"),
+        State("runs-cache", "data"),
+        State("config-keys-store", "data"),
+        State("filters-store", "data"),
+        State("metrics-select", "value"),
+        State("metrics-show-keys-switch", "value"),
+        State("metrics-layout-mode", "value"),
+        State("metrics-downsample-mode", "value"),
+        State("metrics-downsample-points", "value"),
         prevent_initial_call=True,
     )
-    def download_steps_csv(n_clicks, filename, columns, data_rows):
-        if not n_clicks:
+    def download_steps_csv(n_clicks, filename, runs_cache, config_store, filters_store, selected_metrics_names, show_keys_switch, layout_mode, downsample_mode, downsample_points):
+        session = get_session(runs_cache)
+        if not n_clicks or session is None:
             return no_update
-        rows = data_rows or []
-        cols = columns or []
-        if len(rows) == 0 or len(cols) == 0:
+        # Nothing to export without filtered runs referencing a selected
+        # metric; the series themselves are only fetched by the download route
+        selected = (config_store or {}).get("selected", [])
+        selected_metrics = [m for m in (selected_metrics_names or []) if isinstance(m, str) and m.strip()]
+        filtered_runs = filter_runs(session, filters_store or {}, selected)
+        if not filtered_runs or not metric_ids_for_runs(filtered_runs, selected_metrics):
             return no_update
-
-        col_ids = [c.get("id") for c in cols if isinstance(c, dict) and c.get("id")]
-        col_names = [c.get("name", c.get("id")) for c in cols]
-
-        buf = io.StringIO()
-        writer = csv.writer(buf)
-        writer.writerow(col_names)
-
-        def stringify(v):
-            if isinstance(v, (list, dict, tuple)):
-                try:
-                    return json.dumps(v, ensure_ascii=False, default=str)
-                except Exception:
-                    return str(v)
-            return v
-
-        for row in rows:
-            writer.writerow([stringify(row.get(cid, "")) for cid in col_ids])
-
-        csv_str = buf.getvalue()
-        buf.close()
-        safe_name = (filename or "").strip() or "metrics_steps.csv"
-        if not safe_name.lower().endswith(".csv"):
-            safe_name += ".csv"
-        return dcc.send_string(csv_str, safe_name)
+        # The table is regenerated server-side instead of sending its data back
+        export_id = register_export({
+            "kind": "metrics_steps",
+            "runs_cache": runs_cache,
+            "config_store": config_store,
+            "filters_store": filters_store,
+            "metrics": selected_metrics_names,
+            "show_keys_switch": show_keys_switch,
+            "layout_mode": layout_mode,
+            "downsample_mode": downsample_mode,
+            "downsample_points": downsample_points,
+            "filename": csv_filename(filename, "metrics_steps.csv"),
+        })
+        return f"/download/metrics_steps.csv?id={export_id}"
 
     @app.callback(
         Output("metrics-steps-table", "page_size"),
@@ -270,6 +211,31 @@ def register_metrics_callbacks(app):
     def restore_metrics_layout_mode(saved):
         return saved if saved in ("rows", "cols") else "rows"
 
+    @app.callback(
+        Output("metrics-downsample-store", "data", allow_duplicate=True),
+        Input("metrics-downsample-mode", "value"),
+        Input("metrics-downsample-points", "value"),
+        prevent_initial_call=True,
+    )
+    def persist_metrics_downsample(mode, points):
+        return {"mode": mode or "none", "points": points}
+
+    @app.callback(
+        Output("metrics-downsample-mode", "value", allow_duplicate=True),
+        Output("metrics-downsample-points", "value", allow_duplicate=True),
+        Input("metrics-downsample-store", "data"),
+        prevent_initial_call=True,
+    )
+    def restore_metrics_downsample(saved):
+        saved = saved if isinstance(saved, dict) else {}
+        mode = saved.get("mode") if saved.get("mode") in DOWNSAMPLE_MODES else "none"
+        try:
+            points = int(saved.get("points"))
+            points = points if points > 0 else 500
+        except Exception:
+            points = 500
+        return mode, points
+
     @app.callback(
         Output("metrics-select", "options"),
         Output("metrics-controls-row", "style"),
@@ -2,16 +2,21 @@
 Pygwalker integration callbacks for AltarExtractor.
 """
 
-from typing import Dict, List
 from dash import Input, Output, State, no_update
 from dash.dependencies import ClientsideFunction
 import dash
-import uuid
+import gzip
 import pandas as pd
 from flask import request, make_response
-from bson import ObjectId
 
 from ..state.cache import PYGWALKER_CACHE
+from ..services.data import build_table_from_runs, add_result_columns
+from ..services.filters import filter_runs
+from ..services.metrics import ensure_metric_values, metrics_steps_table
+from ..services.projection import ensure_config_fields
+from ..state.runs import get_session
+from .experiments import experiments_view
+from .metrics import metrics_steps_view
 
 
 def register_pygwalker(app, server):
@@ -29,13 +34,28 @@ def register_pygwalker(app, server):
     def pygwalker_route():
         try:
             key = request.args.get("id", "").strip()
-            data = PYGWALKER_CACHE.get(key, [])
-            df = pd.DataFrame(data or [])
-            try:
-                from pygwalker.api.html import to_html
-                html_str = to_html(df, title="AltarExtractor — Pygwalker")
-            except Exception:
-                html_str = f"""
+            # Dataset keys are content hashes, so the key identifies the page;
+            # strong validators differ per content coding
+            gzipped = "gzip" in request.accept_encodings
+            etag = f"{key}-gz" if gzipped else key
+            if key and request.if_none_match.contains(etag) and PYGWALKER_CACHE.get_html(key) is not None:
+                resp = make_response("", 304)
+                resp.set_etag(etag)
+                resp.headers["Vary"] = "Accept-Encoding"
+                return resp
+
+            page = PYGWALKER_CACHE.get_html(key)
+            if page is None:
+                df = PYGWALKER_CACHE.get(key)
+                cacheable = df is not None
+                if df is None:
+                    df = pd.DataFrame([])
+                try:
+                    from pygwalker.api.html import to_html
+                    html_str = to_html(df, title="AltarExtractor — Pygwalker")
+                except Exception:
+                    cacheable = False
+                    html_str = f"""
 <!DOCTYPE html>
 <html>
   <head><meta charset="utf-8"><title>Pygwalker unavailable</title></head>
@@ -47,8 +67,21 @@ def register_pygwalker(app, server):
   </body>
 </html>
 """.strip()
-            resp = make_response(html_str)
+                if not cacheable:
+                    resp = make_response(html_str)
+                    resp.headers["Content-Type"] = "text/html; charset=utf-8"
+                    return resp
+                page = PYGWALKER_CACHE.set_html(key, html_str)
+
+            if gzipped:
+                resp = make_response(page)
+                resp.headers["Content-Encoding"] = "gzip"
+            else:
+                resp = make_response(gzip.decompress(page))
             resp.headers["Content-Type"] = "text/html; charset=utf-8"
+            resp.headers["Cache-Control"] = "private, no-cache"
+            resp.headers["Vary"] = "Accept-Encoding"
+            resp.set_etag(etag)
             return resp
         except Exception as exc:
             resp = make_response(f"Failed to render pygwalker page: {exc}")
@@ -84,57 +117,29 @@ def register_pygwalker(app, server):
         State("config-keys-store", "data"),
         State("filters-store", "data"),
         State("results-select", "value"),
-        State("experiments-table", "data"),
+        State("experiments-random-store", "data"),
+        State("experiments-table", "sort_by"),
+        State("experiments-table", "filter_query"),
         prevent_initial_call=True,
     )
-    def open_pygwalker_exp_choice(click_all, click_sel, runs_cache, config_store, filters_store, selected_result_keys, table_data):
+    def open_pygwalker_exp_choice(click_all, click_sel, runs_cache, config_store, filters_store, selected_result_keys, random_store, sort_by, filter_query):
         ctx = dash.callback_context
         if not ctx.triggered:
             return no_update, no_update
         which = ctx.triggered[0]["prop_id"].split(".")[0]
 
-        runs = runs_cache or []
         selected = (config_store or {}).get("selected", [])
         available = (config_store or {}).get("available", [])
         all_keys = list(dict.fromkeys(list(available) + list(selected)))
-        active_filters = filters_store or {}
-
-        def row_passes_filters(run_cfg: Dict) -> bool:
-            for key in selected:
-                f = active_filters.get(key) if isinstance(active_filters, dict) else None
-                if not f:
-                    continue
-                value = run_cfg.get(key, None) if isinstance(run_cfg, dict) else None
-                mode = f.get("mode") if isinstance(f, dict) else None
-                if mode in ("true", "false"):
-                    if not isinstance(value, bool):
-                        return False
-                    desired = (mode == "true")
-                    if value != desired:
-                        return False
-                has_min = "min" in f and f.get("min") is not None
-                has_max = "max" in f and f.get("max") is not None
-                if has_min or has_max:
-                    if not isinstance(value, (int, float)) or isinstance(value, bool):
-                        return False
-                    if has_min and value < f.get("min"):
-                        return False
-                    if has_max and value > f.get("max"):
-                        return False
-                values = f.get("values") if isinstance(f, dict) else None
-                if isinstance(values, list) and len(values) > 0:
-                    if not isinstance(value, str):
-                        return False
-                    if value not in values:
-                        return False
-            return True
-
-        filtered_runs = [run for run in runs if row_passes_filters(run.get("config", {}) or {})]
+        if which == "open-exp-all-keys":
+            ensure_config_fields(get_session(runs_cache), all_keys)
+        filtered_runs = experiments_view(runs_cache, config_store, filters_store, random_store, sort_by, filter_query)
 
         result_keys = [k for k in (selected_result_keys or []) if isinstance(k, str) and k.strip()]
         data = []
         if which == "open-exp-selected-keys":
-            data = table_data or []
+            _, data = build_table_from_runs(filtered_runs, selected)
+            add_result_columns([], data, filtered_runs, result_keys)
         else:
             for run in filtered_runs:
                 row = {"run_id": run.get("run_id", ""), "experiment": run.get("experiment", "")}
@@ -149,9 +154,8 @@ def register_pygwalker(app, server):
                         row[f"result:{key}"] = r.get(key, "")
                 data.append(row)
 
-        key = str(uuid.uuid4())
         try:
-            PYGWALKER_CACHE[key] = data
+            key = PYGWALKER_CACHE.add(data)
         except Exception:
             return no_update, False
         return f"/pygwalker?id={key}", False
@@ -166,114 +170,41 @@ def register_pygwalker(app, server):
         State("config-keys-store", "data"),
         State("filters-store", "data"),
         State("metrics-select", "value"),
-        State("metrics-values-store", "data"),
-        State("metrics-steps-table", "data"),
+        State("metrics-show-keys-switch", "value"),
+        State("metrics-layout-mode", "value"),
+        State("metrics-downsample-mode", "value"),
+        State("metrics-downsample-points", "value"),
         prevent_initial_call=True,
     )
-    def open_pygwalker_steps_choice(click_all, click_sel, runs_cache, config_store, filters_store, selected_metrics_names, metrics_values_map, table_data):
+    def open_pygwalker_steps_choice(click_all, click_sel, runs_cache, config_store, filters_store, selected_metrics_names, show_keys_switch, layout_mode, downsample_mode, downsample_points):
         ctx = dash.callback_context
         if not ctx.triggered:
             return no_update, no_update
         which = ctx.triggered[0]["prop_id"].split(".")[0]
 
+        session = get_session(runs_cache) or {}
         if which == "open-steps-selected-keys":
-            data = table_data or []
-            key = str(uuid.uuid4())
-            try:
-                PYGWALKER_CACHE[key] = data
-            except Exception:
-                return no_update, False
-            return f"/pygwalker?id={key}", False
-
-        runs = runs_cache or []
-        selected = (config_store or {}).get("selected", [])
-        available = (config_store or {}).get("available", [])
-        all_keys = list(dict.fromkeys(list(available) + list(selected)))
-        active_filters = filters_store or {}
-        metrics_values_map = metrics_values_map or {}
-        selected_metrics = [m for m in (selected_metrics_names or []) if isinstance(m, str) and m.strip()]
-
-        def row_passes_filters(run_cfg: Dict) -> bool:
-            for key in selected:
-                f = active_filters.get(key) if isinstance(active_filters, dict) else None
-                if not f:
-                    continue
-                value = run_cfg.get(key, None) if isinstance(run_cfg, dict) else None
-                mode = f.get("mode") if isinstance(f, dict) else None
-                if mode in ("true", "false"):
-                    if not isinstance(value, bool):
-                        return False
-                    desired = (mode == "true")
-                    if value != desired:
-                        return False
-                has_min = "min" in f and f.get("min") is not None
-                has_max = "max" in f and f.get("max") is not None
-                if has_min or has_max:
-                    if not isinstance(value, (int, float)) or isinstance(value, bool):
-                        return False
-                    if has_min and value < f.get("min"):
-                        return False
-                    if has_max and value > f.get("max"):
-                        return False
-                values = f.get("values") if isinstance(f, dict) else None
-                if isinstance(values, list) and len(values) > 0:
-                    if not isinstance(value, str):
-                        return False
-                    if value not in values:
-                        return False
-            return True
-
-        filtered_runs = [run for run in runs if row_passes_filters(run.get("config", {}) or {})]
-
-        def extract_metric_id_for_run(run_metrics, metric_name):
-            if isinstance(run_metrics, dict):
-                v = run_metrics.get(metric_name, None)
-                if isinstance(v, dict) and v.get("id") is not None:
-                    return str(v.get("id"))
-                if isinstance(v, (str, ObjectId)):
-                    return str(v)
-                return None
-            if isinstance(run_metrics, list):
-                for item in run_metrics:
-                    if isinstance(item, dict) and item.get("name") == metric_name:
-                        mid = item.get("id") or item.get("_id")
-                        if mid is not None:
-                            return str(mid)
-                        return None
-            return None
-
-        rows: List[Dict] = []
-        for run in filtered_runs:
-            base = {"run_id": run.get("run_id", ""), "experiment": run.get("experiment", "")}
-            cfg = run.get("config", {}) or {}
-            for key in all_keys:
-                base[key] = cfg.get(key)
-
-            run_metrics = run.get("metrics", None)
-            step_grid = None
-            metric_series: Dict[str, List] = {}
-            for mname in selected_metrics:
-                mid = extract_metric_id_for_run(run_metrics, mname)
-                payload = (metrics_values_map or {}).get(str(mid), {}) if mid else {}
-                values = payload.get("values") or []
-                steps = payload.get("steps") or list(range(len(values)))
-                metric_series[mname] = values
-                if steps and (step_grid is None or len(steps) > len(step_grid)):
-                    step_grid = steps
-            if step_grid is None:
-                continue
-
-            for idx, step in enumerate(step_grid):
-                row = dict(base)
-                row["step"] = step
-                for mname in selected_metrics:
-                    series = metric_series.get(mname, [])
-                    row[f"metric:{mname}"] = series[idx] if idx < len(series) else ""
-                rows.append(row)
-
-        key = str(uuid.uuid4())
+            # The table only holds the visible page; rebuild all of its columns
+            _, _, column_range = metrics_steps_view(
+                session, config_store, filters_store, selected_metrics_names,
+                show_keys_switch, layout_mode, downsample_mode, downsample_points,
+            )
+        else:
+            selected = (config_store or {}).get("selected", [])
+            available = (config_store or {}).get("available", [])
+            all_keys = list(dict.fromkeys(list(available) + list(selected)))
+            ensure_config_fields(session, all_keys)
+            selected_metrics = [m for m in (selected_metrics_names or []) if isinstance(m, str) and m.strip()]
+            filtered_runs = filter_runs(session, filters_store or {}, selected)
+            metrics_values_map = ensure_metric_values(session, filtered_runs, selected_metrics, downsample_mode, downsample_points)
+            _, _, column_range = metrics_steps_table(
+                filtered_runs, metrics_values_map, selected_metrics, all_keys, False, downsample_mode, downsample_points,
+            )
+
+        # Columnar, so the Arrow table is written without one dict per step
+        columns = column_range()
         try:
-            PYGWALKER_CACHE[key] = rows
+            key = PYGWALKER_CACHE.add(columns)
         except Exception:
             return no_update, False
         return f"/pygwalker?id={key}", False
@@ -4,7 +4,7 @@ Main layout for AltarExtractor application.
 
 from dash import html, dcc, dash_table
 import dash_bootstrap_components as dbc
-from ..config import DEFAULT_DB_NAME
+from ..config import DEFAULT_DB_NAME, LIVE_REFRESH_INTERVAL_MS, RUNS_LOAD_INTERVAL_MS
 
 
 def build_layout():
@@ -19,15 +19,19 @@ def build_layout():
             dcc.Store(id="config-keys-store", storage_type="local"),
             dcc.Store(id="filters-store", storage_type="local"),
             dcc.Store(id="metrics-store", storage_type="memory"),
-            dcc.Store(id="metrics-values-store", storage_type="memory"),
             dcc.Store(id="metrics-selected-store", storage_type="local"),
             dcc.Store(id="experiments-random-store", storage_type="local"),
             dcc.Store(id="experiments-page-size-store", storage_type="local"),
             dcc.Store(id="metrics-page-size-store", storage_type="local"),
             dcc.Store(id="metrics-show-keys-store", storage_type="local"),
             dcc.Store(id="metrics-layout-mode-store", storage_type="local"),
+            dcc.Store(id="metrics-downsample-store", storage_type="local"),
+            dcc.Store(id="experiment-scope-store", storage_type="local"),
             dcc.Store(id="results-store", storage_type="memory"),
+            dcc.Store(id="metrics-live-store", storage_type="memory"),
             dcc.Interval(id="init-tick", interval=0, n_intervals=0, max_intervals=1),
+            dcc.Interval(id="runs-load-tick", interval=RUNS_LOAD_INTERVAL_MS, n_intervals=0, disabled=True),
+            dcc.Interval(id="live-tick", interval=LIVE_REFRESH_INTERVAL_MS, n_intervals=0, disabled=True),
 
             # Navbar
             dbc.Navbar(
@@ -149,7 +153,29 @@ def build_layout():
                         ),
                         dbc.Col(
                             dbc.Card(
-                                dbc.CardBody([]),
+                                dbc.CardBody(
+                                    [
+                                        html.Div("Index advisor", style={"fontWeight": "600", "marginBottom": "0.5rem"}),
+                                        html.P(
+                                            "Check which indexes exist on the runs and metrics collections and how MongoDB plans the queries of this app.",
+                                            style={"color": "#666"},
+                                        ),
+                                        html.Div(
+                                            [
+                                                dbc.Button("Check indexes", id="index-check-button", color="secondary", outline=True, n_clicks=0, class_name="me-2"),
+                                                dcc.ConfirmDialogProvider(
+                                                    dbc.Button("Create missing indexes", id="index-create-button", color="warning", outline=True, n_clicks=0),
+                                                    id="index-create-confirm",
+                                                    message="Create the missing recommended indexes on this database? Index builds can take a while on large collections.",
+                                                ),
+                                            ],
+                                            className="d-flex mb-2",
+                                        ),
+                                        html.Div(id="index-build-status"),
+                                        dcc.Interval(id="index-build-tick", interval=1000, n_intervals=0, disabled=True),
+                                        dcc.Loading(html.Div(id="index-report"), type="default"),
+                                    ]
+                                ),
                                 class_name="mb-3",
                             ),
                             md=6,
@@ -173,7 +199,20 @@ def build_layout():
                     dbc.Col(
                         [
                             dbc.Label(" "),
-                            dbc.Button("Connect", id="connect-button", color="primary", n_clicks=0, class_name="d-block"),
+                            html.Div(
+                                [
+                                    dbc.Button("Connect", id="connect-button", color="primary", n_clicks=0),
+                                    dbc.Button("Refresh", id="refresh-button", color="secondary", outline=True, n_clicks=0, class_name="ms-2"),
+                                    dbc.Checklist(
+                                        options=[{"label": "Live", "value": "live"}],
+                                        value=[],
+                                        id="live-switch",
+                                        switch=True,
+                                        class_name="ms-3 align-self-center",
+                                    ),
+                                ],
+                                className="d-flex",
+                            ),
                         ],
                         md=2,
                     ),
@@ -181,12 +220,35 @@ def build_layout():
                         [
                             dbc.Label(" "),
                             dbc.Alert(id="status-alert", is_open=False, color="light", class_name="mb-0"),
+                            dbc.Progress(id="runs-load-progress", value=0, label="", striped=True, animated=True, style={"display": "none"}),
                         ],
                         md=6,
                     ),
                 ],
                 class_name="g-2 align-items-end mb-3",
             ),
+            dbc.Row(
+                [
+                    dbc.Col(
+                        [
+                            dbc.Label("Experiments"),
+                            dcc.Dropdown(
+                                id="experiment-scope-select",
+                                options=[],
+                                value=[],
+                                multi=True,
+                                placeholder="All experiments (pick some and click Connect to load only their runs)",
+                            ),
+                        ],
+                        md=6,
+                    ),
+                    dbc.Col(
+                        dbc.Button("List experiments", id="experiment-list-button", color="secondary", outline=True, n_clicks=0),
+                        width="auto",
+                    ),
+                ],
+                class_name="g-2 mb-3 align-items-end",
+            ),
 
             # Select Keys card
             dbc.Card(
@@ -306,6 +368,13 @@ def build_layout():
                                     columns=[{"name": "Experiment", "id": "experiment"}],
                                     data=[],
                                     page_size=20,
+                                    page_current=0,
+                                    page_action="custom",
+                                    sort_action="custom",
+                                    sort_mode="multi",
+                                    sort_by=[],
+                                    filter_action="custom",
+                                    filter_query="",
                                     style_table={"overflowX": "auto", "width": "100%"},
                                     style_cell={"textAlign": "left", "padding": "8px"},
                                     style_header={"fontWeight": "bold"},
@@ -348,7 +417,8 @@ def build_layout():
                                     id="download-exp-modal",
                                     is_open=False,
                                 ),
-                                dcc.Download(id="download-exp-csv"),
+                                dcc.Store(id="download-exp-url"),
+                                html.Div(id="download-exp-start-dummy", style={"display": "none"}),
                             ]
                         ),
                         id="experiments-collapse",
@@ -425,6 +495,28 @@ def build_layout():
                                                     width="auto",
                                                     class_name="ms-3",
                                                 ),
+                                                dbc.Col(
+                                                    [
+                                                        dbc.Label("Downsample"),
+                                                        dcc.Dropdown(
+                                                            id="metrics-downsample-mode",
+                                                            options=[
+                                                                {"label": "None", "value": "none"},
+                                                                {"label": "Every Nth point", "value": "stride"},
+                                                                {"label": "Bucket mean", "value": "mean"},
+                                                                {"label": "Bucket min/max", "value": "minmax"},
+                                                                {"label": "LTTB", "value": "lttb"},
+                                                            ],
+                                                            value="none",
+                                                            clearable=False,
+                                                            style={"width": "170px", "display": "inline-block", "marginLeft": "8px", "verticalAlign": "middle"},
+                                                        ),
+                                                        dcc.Input(id="metrics-downsample-points", type="number", value=500, min=3, step=1, style={"width": "90px", "marginLeft": "8px"}),
+                                                        dbc.Label("points", class_name="ms-1"),
+                                                    ],
+                                                    width="auto",
+                                                    class_name="ms-3",
+                                                ),
                                             ],
                                             class_name="g-2 align-items-center mb-2",
                                         ),
@@ -433,6 +525,8 @@ def build_layout():
                                             columns=[{"name": "Experiment", "id": "experiment"}],
                                             data=[],
                                             page_size=20,
+                                            page_current=0,
+                                            page_action="custom",
                                             style_table={"overflowX": "auto", "width": "100%"},
                                             style_cell={"textAlign": "left", "padding": "8px"},
                                             style_header={"fontWeight": "bold"},
@@ -475,7 +569,8 @@ def build_layout():
                                             id="download-steps-modal",
                                             is_open=False,
                                         ),
-                                        dcc.Download(id="download-steps-csv"),
+                                        dcc.Store(id="download-steps-url"),
+                                        html.Div(id="download-steps-start-dummy", style={"display": "none"}),
                                         dcc.Store(id="pygwalker-url"),
                                         html.Div(id="pygwalker-open-dummy", style={"display": "none"}),
                                     ],
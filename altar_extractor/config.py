@@ -3,6 +3,87 @@ Configuration settings for AltarExtractor.
 """
 
 import os
+import tempfile
 
 DEFAULT_DB_NAME = os.environ.get("SACRED_DB_NAME", "sacred")
 
+
+# Maximum number of loaded run sets kept in server memory (one per connected browser tab)
+RUN_STORE_MAX_SESSIONS = int(os.environ.get("RUN_STORE_MAX_SESSIONS", "16"))
+
+# Number of runs fetched per MongoDB round trip while loading
+RUNS_BATCH_SIZE = int(os.environ.get("RUNS_BATCH_SIZE", "1000"))
+
+# Background batches loaded between refreshes of the tables while loading
+RUNS_REFRESH_EVERY_BATCHES = int(os.environ.get("RUNS_REFRESH_EVERY_BATCHES", "10"))
+
+# Delay in milliseconds between background run batches
+RUNS_LOAD_INTERVAL_MS = int(os.environ.get("RUNS_LOAD_INTERVAL_MS", "250"))
+
+# Delay in milliseconds between live updates while "Live" is on
+LIVE_REFRESH_INTERVAL_MS = int(os.environ.get("LIVE_REFRESH_INTERVAL_MS", "5000"))
+
+# Seconds subtracted from the last sync time when refreshing, to tolerate clock skew between workers
+RUNS_REFRESH_OVERLAP_S = float(os.environ.get("RUNS_REFRESH_OVERLAP_S", "120"))
+
+# Seconds a per-database config key statistics aggregation stays cached
+CONFIG_STATS_TTL = float(os.environ.get("CONFIG_STATS_TTL", "300"))
+
+# Runs sampled for the config key statistics aggregation (0 scans all matching runs)
+CONFIG_STATS_SAMPLE_SIZE = int(os.environ.get("CONFIG_STATS_SAMPLE_SIZE", "20000"))
+
+# Runs fetched at most when config filters are pushed down to MongoDB while loading
+FILTER_PUSHDOWN_MAX_RUNS = int(os.environ.get("FILTER_PUSHDOWN_MAX_RUNS", "5000"))
+
+# Threads running independent MongoDB queries concurrently (connect, metric chunks)
+MONGO_QUERY_WORKERS = int(os.environ.get("MONGO_QUERY_WORKERS", "8"))
+
+# Metric IDs per `$in` query when fetching metric series, and chunks queried at once
+METRICS_FETCH_CHUNK_SIZE = int(os.environ.get("METRICS_FETCH_CHUNK_SIZE", "500"))
+METRICS_FETCH_CONCURRENCY = int(os.environ.get("METRICS_FETCH_CONCURRENCY", "4"))
+
+# Seconds the list of Sacred collections present in a database stays cached
+SCHEMA_PROBE_TTL = float(os.environ.get("SCHEMA_PROBE_TTL", "60"))
+
+# Runs sampled with $sample to discover config keys on first use (0 scans every run)
+CONFIG_KEYS_SAMPLE_SIZE = int(os.environ.get("CONFIG_KEYS_SAMPLE_SIZE", "0"))
+
+# Seconds before the incrementally updated config key catalog is rebuilt from scratch
+CONFIG_KEYS_TTL = float(os.environ.get("CONFIG_KEYS_TTL", "3600"))
+
+# Most frequent string values reported per config key by the statistics aggregation
+CONFIG_STATS_TOP_N = int(os.environ.get("CONFIG_STATS_TOP_N", "50"))
+
+# Upper bound on metric points (values + steps) kept in the metric series cache
+METRICS_CACHE_MAX_POINTS = int(os.environ.get("METRICS_CACHE_MAX_POINTS", "5000000"))
+
+# Serve the metric series cache counters at /metrics-cache/stats (unauthenticated)
+METRICS_CACHE_STATS_ROUTE = os.environ.get("METRICS_CACHE_STATS_ROUTE", "false").lower() in ("true", "1", "yes")
+
+# Pooled MongoDB clients kept open at once (one per distinct connection URI)
+MONGO_MAX_CLIENTS = int(os.environ.get("MONGO_MAX_CLIENTS", "8"))
+
+# Connection pool bounds of each MongoDB client
+MONGO_MAX_POOL_SIZE = int(os.environ.get("MONGO_MAX_POOL_SIZE", "50"))
+MONGO_MIN_POOL_SIZE = int(os.environ.get("MONGO_MIN_POOL_SIZE", "0"))
+
+# Milliseconds an idle pooled connection stays open before being closed
+MONGO_MAX_IDLE_TIME_MS = int(os.environ.get("MONGO_MAX_IDLE_TIME_MS", "300000"))
+
+# Milliseconds to wait for a reachable server before a query fails
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+
+# Where datasets opened in Pygwalker are kept: "memory" (this process), "disk"
+# (a directory shared by all workers) or "redis" (a Redis-compatible server)
+PYGWALKER_CACHE_BACKEND = os.environ.get("PYGWALKER_CACHE_BACKEND", "disk")
+PYGWALKER_CACHE_DIR = os.environ.get(
+    "PYGWALKER_CACHE_DIR", os.path.join(tempfile.gettempdir(), "altar_extractor_pygwalker")
+)
+PYGWALKER_CACHE_URL = os.environ.get("PYGWALKER_CACHE_URL", "redis://localhost:6379/0")
+
+# Seconds a Pygwalker dataset is kept without being opened
+PYGWALKER_CACHE_TTL = int(os.environ.get("PYGWALKER_CACHE_TTL", "3600"))
+
+# Total size of stored Pygwalker datasets before the least recently opened
+# ones are evicted (compressed bytes)
+PYGWALKER_CACHE_MAX_BYTES = int(os.environ.get("PYGWALKER_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
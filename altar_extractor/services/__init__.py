@@ -6,25 +6,117 @@ from .mongo import (
     build_mongodb_uri,
     fetch_sacred_experiment_names,
     fetch_config_keys,
+    fetch_config_key_stats,
     fetch_runs_docs,
+    fetch_runs_batch,
+    iter_runs_docs,
+    count_runs,
+    combine_queries,
+    experiment_scope_query,
+    runs_projection,
+    fetch_runs_changed_since,
     fetch_metrics_list,
     fetch_metrics_values_map,
+    fetch_metrics_values_strided,
+    iter_metrics_values,
+    probe_collections,
+    has_collection,
+    submit_query,
 )
 from .data import (
     collect_metric_ids_from_runs,
+    collect_metric_names_from_runs,
+    collect_result_keys_from_runs,
     build_table_from_runs,
+    add_result_columns,
     attempt_connect_and_list,
 )
+from .filters import (
+    compile_filter_predicate,
+    compile_filters_to_match,
+    candidate_runs,
+    pushdown_note,
+    filter_runs,
+)
+from .metrics import (
+    extract_metric_id_for_run,
+    metric_ids_for_runs,
+    ensure_metric_values,
+    metric_series_for_run,
+    metrics_steps_table,
+    iter_column_rows,
+)
+from .downsample import (
+    DOWNSAMPLE_MODES,
+    downsample_series,
+)
+from .indexes import (
+    recommended_indexes,
+    index_report,
+    create_recommended_indexes,
+    missing_indexes,
+    start_index_build,
+    index_build_status,
+)
+from .query import (
+    query_experiment_runs,
+    paginate,
+)
+from .export import (
+    experiments_table,
+    iter_csv,
+    csv_response,
+)
 
 __all__ = [
     "build_mongodb_uri",
     "fetch_sacred_experiment_names",
     "fetch_config_keys",
+    "fetch_config_key_stats",
     "fetch_runs_docs",
+    "fetch_runs_batch",
+    "iter_runs_docs",
+    "count_runs",
+    "combine_queries",
+    "experiment_scope_query",
+    "runs_projection",
+    "fetch_runs_changed_since",
     "fetch_metrics_list",
     "fetch_metrics_values_map",
+    "fetch_metrics_values_strided",
+    "iter_metrics_values",
+    "probe_collections",
+    "has_collection",
+    "submit_query",
     "collect_metric_ids_from_runs",
+    "collect_metric_names_from_runs",
+    "collect_result_keys_from_runs",
     "build_table_from_runs",
+    "add_result_columns",
     "attempt_connect_and_list",
+    "compile_filter_predicate",
+    "compile_filters_to_match",
+    "candidate_runs",
+    "pushdown_note",
+    "filter_runs",
+    "extract_metric_id_for_run",
+    "metric_ids_for_runs",
+    "ensure_metric_values",
+    "DOWNSAMPLE_MODES",
+    "downsample_series",
+    "metric_series_for_run",
+    "metrics_steps_table",
+    "iter_column_rows",
+    "recommended_indexes",
+    "index_report",
+    "create_recommended_indexes",
+    "missing_indexes",
+    "start_index_build",
+    "index_build_status",
+    "query_experiment_runs",
+    "paginate",
+    "experiments_table",
+    "iter_csv",
+    "csv_response",
 ]
 
@@ -4,9 +4,10 @@ Data processing utilities for AltarExtractor.
 
 from typing import Dict, List, Tuple
 from bson import ObjectId
-import pymongo
+import json
 
 from .mongo import fetch_sacred_experiment_names
+from ..state.clients import get_client, release_client
 
 
 def collect_metric_ids_from_runs(runs: List[Dict]) -> List[str]:
@@ -32,6 +33,40 @@ def collect_metric_ids_from_runs(runs: List[Dict]) -> List[str]:
     return sorted(ids)
 
 
+def collect_metric_names_from_runs(runs: List[Dict]) -> List[str]:
+    """
+    Extract all metric names referenced in runs.
+    """
+    metric_names = set()
+    for r in runs or []:
+        m = r.get("metrics", None)
+        if isinstance(m, dict):
+            for k in m.keys():
+                if isinstance(k, str) and k.strip():
+                    metric_names.add(k)
+        elif isinstance(m, list):
+            for item in m:
+                if isinstance(item, dict):
+                    nm = item.get("name")
+                    if isinstance(nm, str) and nm.strip():
+                        metric_names.add(nm)
+    return sorted(metric_names)
+
+
+def collect_result_keys_from_runs(runs: List[Dict]) -> List[str]:
+    """
+    Extract all keys found in the 'result' dicts of runs.
+    """
+    result_keys = set()
+    for r in runs or []:
+        res = r.get("result", None)
+        if isinstance(res, dict):
+            for k in res.keys():
+                if isinstance(k, str) and k.strip():
+                    result_keys.add(k)
+    return sorted(result_keys)
+
+
 def build_table_from_runs(runs: List[Dict], selected_keys: List[str]) -> Tuple[List[Dict], List[Dict]]:
     """
     Build DataTable columns and rows based on selected configuration keys.
@@ -54,6 +89,32 @@ def build_table_from_runs(runs: List[Dict], selected_keys: List[str]) -> Tuple[L
     return columns, rows
 
 
+def add_result_columns(columns: List[Dict], rows: List[Dict], runs: List[Dict], result_keys: List[str]) -> None:
+    """
+    Append `result:<key>` columns to a table built by build_table_from_runs.
+    Rows are updated in place; list/dict values are JSON-encoded.
+    """
+    for key in result_keys:
+        columns.append({"name": key, "id": f"result:{key}"})
+    for idx, run in enumerate(runs):
+        if idx >= len(rows):
+            continue
+        r = run.get("result", None)
+        if not isinstance(r, dict) or len(r) == 0:
+            for key in result_keys:
+                rows[idx][f"result:{key}"] = ""
+        else:
+            for key in result_keys:
+                val = r.get(key, None)
+                if val is None:
+                    rows[idx][f"result:{key}"] = ""
+                else:
+                    try:
+                        rows[idx][f"result:{key}"] = json.dumps(val, ensure_ascii=False, default=str) if isinstance(val, (list, dict)) else val
+                    except Exception:
+                        rows[idx][f"result:{key}"] = str(val)
+
+
 def attempt_connect_and_list(
     uri: str, database_name: str
 ) -> Tuple[str, Dict, List[Dict]]:
@@ -61,10 +122,12 @@ def attempt_connect_and_list(
     Try to connect to MongoDB using the provided URI and list Sacred experiments.
     Returns: (status_text, style_dict, table_rows)
     """
+    key = None
     try:
-        client = pymongo.MongoClient(uri, serverSelectionTimeoutMS=5000)
+        key, client = get_client(uri)
         client.admin.command("ping")
     except Exception as exc:
+        release_client(key)
         return (
             f"Connection failed: {exc}",
             {"color": "#b00020"},
@@ -88,4 +151,6 @@ def attempt_connect_and_list(
             {"color": "#b00020"},
             [],
         )
+    finally:
+        release_client(key)
 
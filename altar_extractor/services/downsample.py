@@ -0,0 +1,116 @@
+"""
+Downsampling of metric series before they are turned into table rows.
+
+Supported modes:
+- "stride": keep every Nth point so that about `target` points remain
+- "mean": split into `target` buckets and keep each bucket's mean
+- "minmax": keep the minimum and maximum of `target / 2` buckets
+- "lttb": Largest-Triangle-Three-Buckets, preserving the visual shape
+"""
+
+from typing import List, Tuple
+import math
+
+import numpy as np
+
+DOWNSAMPLE_MODES = ("none", "stride", "mean", "minmax", "lttb")
+
+
+def stride_step(length: int, target: int) -> int:
+    """
+    Step between kept points so that at most `target` points remain.
+    Matches the step computed by the MongoDB stride projection.
+    """
+    if target <= 0 or length <= target:
+        return 1
+    return int(math.ceil(length / target))
+
+
+def _as_float_array(values: List) -> np.ndarray:
+    return np.array([v if isinstance(v, (int, float)) and not isinstance(v, bool) else np.nan for v in values], dtype=float)
+
+
+def _bucket_bounds(length: int, buckets: int) -> List[Tuple[int, int]]:
+    edges = np.linspace(0, length, num=buckets + 1).astype(int)
+    return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, target: int) -> np.ndarray:
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets.
+    """
+    n = len(x)
+    if target >= n or target < 3:
+        return np.arange(n)
+    bucket_size = (n - 2) / (target - 2)
+    indices = [0]
+    a = 0
+    for i in range(target - 2):
+        start = int(math.floor(i * bucket_size)) + 1
+        end = min(int(math.floor((i + 1) * bucket_size)) + 1, n - 1)
+        next_end = min(int(math.floor((i + 2) * bucket_size)) + 1, n)
+        if end <= start:
+            continue
+        next_x = x[end:next_end] if next_end > end else x[n - 1:]
+        next_y = y[end:next_end] if next_end > end else y[n - 1:]
+        avg_x = np.nanmean(next_x) if np.any(~np.isnan(next_x)) else x[n - 1]
+        avg_y = np.nanmean(next_y) if np.any(~np.isnan(next_y)) else y[n - 1]
+        xs = x[start:end]
+        ys = y[start:end]
+        area = np.abs((x[a] - avg_x) * (ys - y[a]) - (x[a] - xs) * (avg_y - y[a]))
+        area = np.where(np.isnan(area), -1.0, area)
+        a = start + int(np.argmax(area))
+        indices.append(a)
+    indices.append(n - 1)
+    return np.array(indices)
+
+
+def downsample_series(steps: List, values: List, mode: str, target: int) -> Tuple[List, List]:
+    """
+    Reduce a (steps, values) series to about `target` points.
+    Returns the series unchanged when it is already small enough or the mode
+    is "none"/unknown.
+    """
+    n = min(len(steps), len(values))
+    try:
+        target = int(target)
+    except Exception:
+        return steps, values
+    if mode not in DOWNSAMPLE_MODES or mode == "none" or target <= 0 or n <= target:
+        return steps, values
+    steps = list(steps[:n])
+    values = list(values[:n])
+
+    if mode == "stride":
+        step = stride_step(n, target)
+        return steps[::step], values[::step]
+
+    y = _as_float_array(values)
+    if np.all(np.isnan(y)):
+        step = stride_step(n, target)
+        return steps[::step], values[::step]
+
+    if mode == "mean":
+        out_steps, out_values = [], []
+        for a, b in _bucket_bounds(n, target):
+            chunk = y[a:b]
+            out_steps.append(steps[a])
+            out_values.append(float(np.nanmean(chunk)) if np.any(~np.isnan(chunk)) else None)
+        return out_steps, out_values
+
+    if mode == "minmax":
+        keep = []
+        for a, b in _bucket_bounds(n, max(target // 2, 1)):
+            chunk = y[a:b]
+            if not np.any(~np.isnan(chunk)):
+                keep.append(a)
+                continue
+            keep.extend(sorted({a + int(np.nanargmin(chunk)), a + int(np.nanargmax(chunk))}))
+        return [steps[i] for i in keep], [values[i] for i in keep]
+
+    # lttb: use numeric steps as x when possible, the point index otherwise
+    x = _as_float_array(steps)
+    if np.any(np.isnan(x)):
+        x = np.arange(n, dtype=float)
+    keep = lttb_indices(x, y, target)
+    return [steps[i] for i in keep], [values[i] for i in keep]
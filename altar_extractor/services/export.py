@@ -0,0 +1,91 @@
+"""
+Streaming CSV exports of the experiments and metric steps tables.
+
+Rows are generated server-side from the run store and encoded in chunks, so a
+download is streamed to the browser instead of sending the whole table back
+through a callback.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Tuple
+import csv
+import io
+import json
+
+from flask import Response, stream_with_context
+from werkzeug.utils import secure_filename
+
+from .data import build_table_from_runs, add_result_columns
+
+# Rows encoded per chunk of the streamed response
+EXPORT_CHUNK_ROWS = 1000
+
+
+def csv_value(v):
+    """
+    Return a cell value as written to CSV; lists and dicts are JSON-encoded.
+    """
+    if isinstance(v, (list, dict, tuple)):
+        try:
+            return json.dumps(v, ensure_ascii=False, default=str)
+        except Exception:
+            return str(v)
+    return v
+
+
+def csv_filename(filename: str, default: str) -> str:
+    """
+    Return a safe download file name ending in ".csv".
+    """
+    name = secure_filename((filename or "").strip()) or default
+    if not name.lower().endswith(".csv"):
+        name += ".csv"
+    return name
+
+
+def iter_csv(columns: List[Dict], rows: Iterable[Dict], chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[str]:
+    """
+    Yield the CSV text of a table in chunks of `chunk_rows` rows.
+    """
+    col_ids = [c.get("id") for c in columns if isinstance(c, dict) and c.get("id")]
+    col_names = [c.get("name", c.get("id")) for c in columns]
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(col_names)
+    pending = 0
+    for row in rows:
+        writer.writerow([csv_value(row.get(cid, "")) for cid in col_ids])
+        pending += 1
+        if pending >= chunk_rows:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate(0)
+            pending = 0
+    yield buf.getvalue()
+
+
+def experiments_table(runs: List[Dict], config_keys: List[str], result_keys: List[str]) -> Tuple[List[Dict], Iterator[Dict]]:
+    """
+    Return (columns, rows) of the experiments table for all `runs`, with rows
+    built lazily in chunks.
+    """
+    columns, _ = build_table_from_runs([], config_keys)
+    add_result_columns(columns, [], [], result_keys)
+
+    def rows() -> Iterator[Dict]:
+        for start in range(0, len(runs), EXPORT_CHUNK_ROWS):
+            chunk = runs[start:start + EXPORT_CHUNK_ROWS]
+            _, chunk_rows = build_table_from_runs(chunk, config_keys)
+            add_result_columns([], chunk_rows, chunk, result_keys)
+            yield from chunk_rows
+
+    return columns, rows()
+
+
+def csv_response(columns: List[Dict], rows: Iterable[Dict], filename: str) -> Response:
+    """
+    Return a chunked CSV download response.
+    """
+    resp = Response(stream_with_context(iter_csv(columns, rows)), mimetype="text/csv")
+    resp.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
@@ -0,0 +1,218 @@
+"""
+Config-key filters for AltarExtractor.
+
+Compiles the `filters-store` structure into a vectorized predicate over the
+columnar config representation, and into a MongoDB `$match` document so
+filtering can run in the database.
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+import threading
+
+import numpy as np
+
+from ..config import FILTER_PUSHDOWN_MAX_RUNS, RUNS_BATCH_SIZE
+from .mongo import combine_queries, iter_runs_docs
+from .projection import ensure_config_fields, session_projection
+from .frame import get_config_column
+
+# Number of filter masks memoized per session
+MAX_CACHED_MASKS = 16
+
+
+def active_filter_items(active_filters: Dict, selected: List[str]) -> List:
+    """
+    Return (key, filter) pairs for the selected keys that have a filter set.
+    """
+    if not isinstance(active_filters, dict):
+        return []
+    items = []
+    for key in selected or []:
+        f = active_filters.get(key)
+        if isinstance(f, dict) and f:
+            items.append((key, f))
+    return items
+
+
+def compile_filter_predicate(active_filters: Dict, selected: List[str]) -> Tuple:
+    """
+    Compile `filters-store` into a hashable predicate: a tuple of
+    (key, kind, args) clauses evaluated column-wise by filter_mask.
+    """
+    clauses = []
+    for key, f in active_filter_items(active_filters, selected):
+        mode = f.get("mode")
+        if mode in ("true", "false"):
+            clauses.append((key, "bool", (mode == "true",)))
+
+        has_min = "min" in f and f.get("min") is not None
+        has_max = "max" in f and f.get("max") is not None
+        if has_min or has_max:
+            clauses.append((key, "range", (f.get("min") if has_min else None, f.get("max") if has_max else None)))
+
+        values = f.get("values")
+        if isinstance(values, list) and len(values) > 0:
+            clauses.append((key, "in", tuple(v for v in values if isinstance(v, (str, int, float, bool)))))
+    return tuple(clauses)
+
+
+def filter_mask(session: Dict, runs: List[Dict], predicate: Tuple) -> np.ndarray:
+    """
+    Evaluate a compiled predicate over the config columns of `runs`.
+    A run passes when its value has the filter's type and satisfies it.
+    """
+    mask = np.ones(len(runs), dtype=bool)
+    for key, kind, args in predicate:
+        column = get_config_column(session, runs, key)
+        if kind == "bool":
+            mask &= column["is_bool"] & (column["bool"] == args[0])
+        elif kind == "range":
+            low, high = args
+            numbers = column["number"]
+            clause = column["is_number"].copy()
+            with np.errstate(invalid="ignore"):
+                if low is not None:
+                    clause &= numbers >= low
+                if high is not None:
+                    clause &= numbers <= high
+            mask &= clause
+        elif kind == "in":
+            mask &= column["is_string"] & column["string"].isin(list(args)).to_numpy()
+    return mask
+
+
+def filter_runs(session: Dict, active_filters: Dict, selected: List[str]) -> List[Dict]:
+    """
+    Return the session runs passing the config filters.
+
+    Masks are memoized per (run list, length, predicate) on the session, so the
+    experiments, metrics and pygwalker callbacks firing for the same filter
+    change share one evaluation.
+    """
+    ensure_config_fields(session, selected)
+    runs = candidate_runs(session, active_filters, selected)
+    predicate = compile_filter_predicate(active_filters, selected)
+    if not predicate or not runs:
+        return list(runs)
+
+    memo_key = (id(runs), len(runs), predicate)
+    lock = session.setdefault("masks_lock", threading.Lock())
+    with lock:
+        masks = session.setdefault("filter_masks", OrderedDict())
+        mask = masks.get(memo_key)
+        if mask is not None:
+            masks.move_to_end(memo_key)
+    if mask is None:
+        mask = filter_mask(session, runs, predicate)
+        with lock:
+            masks[memo_key] = mask
+            while len(masks) > MAX_CACHED_MASKS:
+                masks.popitem(last=False)
+    return [runs[i] for i in np.flatnonzero(mask)]
+
+
+def compile_filters_to_match(active_filters: Dict, selected: List[str]) -> Dict:
+    """
+    Compile `filters-store` into a MongoDB `$match` document on `config.<key>`.
+
+    The result selects the same runs as filter_mask. Keys that cannot be
+    addressed with dot notation (containing '.' or starting with '$') are left
+    out, so the query may return a superset; callers still apply the Python
+    filters on top. Returns {} when no filter is active.
+    """
+    clauses: List[Dict] = []
+    for key, f in active_filter_items(active_filters, selected):
+        if not isinstance(key, str) or not key or "." in key or key.startswith("$"):
+            continue
+        field = f"config.{key}"
+
+        mode = f.get("mode")
+        if mode in ("true", "false"):
+            # Equality with a BSON boolean never matches numbers
+            clauses.append({field: (mode == "true")})
+
+        has_min = "min" in f and f.get("min") is not None
+        has_max = "max" in f and f.get("max") is not None
+        if has_min or has_max:
+            # $type "number" excludes booleans, like the Python check
+            cond: Dict = {"$type": "number"}
+            if has_min:
+                cond["$gte"] = f.get("min")
+            if has_max:
+                cond["$lte"] = f.get("max")
+            clauses.append({field: cond})
+
+        values = f.get("values")
+        if isinstance(values, list) and len(values) > 0:
+            strings = [v for v in values if isinstance(v, str)]
+            # Arrays would match $in element-wise; the Python filter rejects them
+            clauses.append({field: {"$in": strings, "$not": {"$type": "array"}}})
+
+    if not clauses:
+        return {}
+    if len(clauses) == 1:
+        return clauses[0]
+    return {"$and": clauses}
+
+
+def candidate_runs(session: Dict, active_filters: Dict, selected: List[str]) -> List[Dict]:
+    """
+    Return the runs the config filters should be evaluated on.
+
+    Once the whole collection has been loaded into the session, filtering is
+    done in memory. While runs are still streaming in, the filters are pushed
+    down to MongoDB so results cover the full collection; at most
+    FILTER_PUSHDOWN_MAX_RUNS matching runs are fetched and cached on the
+    session per compiled query. When the query fails, the loaded runs are
+    filtered instead. `pushdown_note` reports both cases.
+    """
+    runs = session.get("runs") or []
+    match = compile_filters_to_match(active_filters, selected)
+    if session.get("done"):
+        return runs
+    if not match:
+        # No stale note about earlier filters
+        session.pop("pushdown", None)
+        return runs
+    client = session.get("client")
+    if client is None:
+        return runs
+
+    lock = session.setdefault("pushdown_lock", threading.Lock())
+    with lock:
+        pushdown = session.get("pushdown")
+        if pushdown and pushdown.get("query") == match:
+            return runs if pushdown["runs"] is None else pushdown["runs"]
+        limit = max(FILTER_PUSHDOWN_MAX_RUNS, 1)
+        matched: List[Dict] = []
+        try:
+            query = combine_queries(session.get("query"), match)
+            batches = iter_runs_docs(
+                client, session.get("database_name"), batch_size=min(RUNS_BATCH_SIZE, limit), query=query, projection=session_projection(session)
+            )
+            for batch in batches:
+                matched.extend(batch)
+                if len(matched) >= limit:
+                    break
+        except Exception as exc:
+            # Kept until the filters change, so callbacks do not retry the query
+            session["pushdown"] = {"query": match, "runs": None, "error": str(exc)}
+            return runs
+        session["pushdown"] = {"query": match, "runs": matched[:limit], "partial": len(matched) >= limit}
+        return session["pushdown"]["runs"]
+
+
+def pushdown_note(session: Dict) -> str:
+    """
+    Return a status note when the filtered runs of a loading session are
+    incomplete: the filter query hit FILTER_PUSHDOWN_MAX_RUNS or failed.
+    """
+    pushdown = (session or {}).get("pushdown")
+    if not pushdown or session.get("done"):
+        return ""
+    if pushdown.get("error"):
+        return f"Filter query failed ({pushdown['error']}); filtering the loaded runs only."
+    if pushdown.get("partial"):
+        return f"Filters match at least {len(pushdown['runs'])} runs; showing the first {len(pushdown['runs'])} until loading finishes."
+    return ""
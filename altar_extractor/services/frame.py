@@ -0,0 +1,273 @@
+"""
+Columnar representation of run configs ("config frame").
+
+Each config key is turned into typed NumPy arrays (booleans, numbers, strings)
+once per run list, so filters can be evaluated as vectorized masks instead of
+a Python loop over runs. Per-key type and cardinality statistics are built in
+the same spirit: once per connection, then extended as run batches arrive.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Number of distinct run lists (session runs, pushed-down subsets) kept per session
+MAX_CACHED_RUN_LISTS = 4
+
+
+def build_config_column(runs: List[Dict], key: str) -> Dict[str, np.ndarray]:
+    """
+    Build the typed arrays for one config key over a list of runs.
+    """
+    n = len(runs)
+    is_bool = np.zeros(n, dtype=bool)
+    bool_values = np.zeros(n, dtype=bool)
+    is_number = np.zeros(n, dtype=bool)
+    numbers = np.full(n, np.nan, dtype=float)
+    is_string = np.zeros(n, dtype=bool)
+    strings = np.empty(n, dtype=object)
+    for i, run in enumerate(runs):
+        cfg = run.get("config", {}) or {}
+        value = cfg.get(key, None) if isinstance(cfg, dict) else None
+        if isinstance(value, bool):
+            is_bool[i] = True
+            bool_values[i] = value
+        elif isinstance(value, (int, float)):
+            is_number[i] = True
+            numbers[i] = value
+        elif isinstance(value, str):
+            is_string[i] = True
+            strings[i] = value
+    return {
+        "is_bool": is_bool,
+        "bool": bool_values,
+        "is_number": is_number,
+        "number": numbers,
+        "is_string": is_string,
+        "string": pd.Series(strings, dtype=object),
+    }
+
+
+def concat_config_columns(head: Dict, tail: Dict) -> Dict:
+    """
+    Concatenate two column dicts built for consecutive slices of a run list.
+    """
+    merged = {}
+    for name, values in head.items():
+        if isinstance(values, pd.Series):
+            merged[name] = pd.concat([values, tail[name]], ignore_index=True)
+        else:
+            merged[name] = np.concatenate([values, tail[name]])
+    return merged
+
+
+def get_config_column(session: Dict, runs: List[Dict], key: str) -> Dict[str, np.ndarray]:
+    """
+    Return the typed arrays for `key` over `runs`, cached on the session.
+    Run lists that grew since the last call are extended incrementally.
+    """
+    lock = session.setdefault("columns_lock", threading.Lock())
+    with lock:
+        cache = session.setdefault("columns", OrderedDict())
+        entry = cache.get(id(runs))
+        if entry is None or entry["runs"] is not runs:
+            # Keep a reference to the list so its id cannot be reused
+            entry = {"runs": runs, "columns": {}}
+            cache[id(runs)] = entry
+            while len(cache) > MAX_CACHED_RUN_LISTS:
+                cache.popitem(last=False)
+        cache.move_to_end(id(runs))
+
+        n = len(runs)
+        column = entry["columns"].get(key)
+        if column is None:
+            column = build_config_column(runs, key)
+        else:
+            built = len(column["is_bool"])
+            if built < n:
+                column = concat_config_columns(column, build_config_column(runs[built:n], key))
+            elif built > n:
+                column = build_config_column(runs, key)
+        entry["columns"][key] = column
+        return column
+
+
+def patch_config_rows(session: Dict, runs: List[Dict], indices: List[int]) -> None:
+    """
+    Update cached config columns, filter masks and statistics after the runs at
+    `indices` were replaced in place with runs having a different config.
+    Only the affected rows of the cached columns are rebuilt.
+    """
+    if not indices:
+        return
+    positions = np.array(sorted(set(indices)), dtype=int)
+    changed = [runs[i] for i in positions]
+    with session.setdefault("columns_lock", threading.Lock()):
+        entry = (session.get("columns") or {}).get(id(runs))
+        if entry is not None and entry["runs"] is runs:
+            for key, column in entry["columns"].items():
+                built = len(column["is_bool"])
+                inside = positions < built
+                if not inside.any():
+                    continue
+                patch = build_config_column([run for run, ok in zip(changed, inside) if ok], key)
+                column = {name: values.copy() for name, values in column.items()}
+                for name, values in patch.items():
+                    if isinstance(values, pd.Series):
+                        column[name].iloc[positions[inside]] = values.to_numpy()
+                    else:
+                        column[name][positions[inside]] = values
+                entry["columns"][key] = column
+    with session.setdefault("masks_lock", threading.Lock()):
+        masks = session.get("filter_masks") or {}
+        for memo_key in [k for k in masks if k[0] == id(runs)]:
+            masks.pop(memo_key, None)
+    with session.setdefault("stats_lock", threading.Lock()):
+        frame = session.get("config_stats")
+        if frame is not None and frame["runs"] is runs:
+            # Values of the previous configs are kept; stats only ever widen
+            update_config_stats(frame["accumulators"], [run for run, i in zip(changed, positions) if i < frame["length"]])
+            frame["summary"] = None
+
+
+def drop_config_columns(session: Dict, keys=None) -> None:
+    """
+    Forget cached config columns of `keys` (all keys when None), together with
+    the filter masks and config statistics built from them.
+    """
+    with session.setdefault("columns_lock", threading.Lock()):
+        for entry in (session.get("columns") or {}).values():
+            for key in list(entry["columns"]):
+                if keys is None or key in keys:
+                    entry["columns"].pop(key, None)
+    with session.setdefault("masks_lock", threading.Lock()):
+        session.pop("filter_masks", None)
+    with session.setdefault("stats_lock", threading.Lock()):
+        session.pop("config_stats", None)
+
+
+def value_type_name(value: Any) -> Optional[str]:
+    """
+    Return the filter type of a config value, or None for missing values.
+    """
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, list):
+        return "list"
+    if isinstance(value, dict):
+        return "dict"
+    return "unknown"
+
+
+def _distinct_token(value: Any):
+    # Scalars are tagged with their type so that True, 1 and 1.0 stay distinct;
+    # only containers need a JSON encoding to become hashable
+    if isinstance(value, float) and value != value:
+        return ("float", "nan")
+    if isinstance(value, (bool, int, float, str)):
+        return (type(value).__name__, value)
+    try:
+        return ("json", json.dumps(value, sort_keys=True, ensure_ascii=False, default=str))
+    except Exception:
+        return ("str", str(value))
+
+
+def update_config_stats(accumulators: Dict[str, Dict], runs: List[Dict]) -> None:
+    """
+    Fold a batch of runs into per-key accumulators of seen types, distinct
+    values and string values.
+    """
+    for run in runs:
+        cfg = run.get("config", {}) or {}
+        if not isinstance(cfg, dict):
+            continue
+        for key, value in cfg.items():
+            acc = accumulators.get(key)
+            if acc is None:
+                acc = {"types": set(), "distinct": set(), "strings": set()}
+                accumulators[key] = acc
+            type_name = value_type_name(value)
+            if type_name is None:
+                continue
+            acc["types"].add(type_name)
+            acc["distinct"].add(_distinct_token(value))
+            if type_name == "string":
+                acc["strings"].add(value)
+
+
+def summarize_config_stats(accumulators: Dict[str, Dict]) -> Dict[str, Dict]:
+    """
+    Turn accumulators into {key: {"type", "count", "strings"}} statistics.
+    """
+    stats: Dict[str, Dict] = {}
+    for key, acc in accumulators.items():
+        types = acc["types"]
+        if len(types) == 0:
+            type_name = "unknown"
+        elif len(types) == 1:
+            type_name = next(iter(types))
+        else:
+            type_name = "mixed"
+        stats[key] = {
+            "type": type_name,
+            "count": len(acc["distinct"]),
+            "strings": sorted(acc["strings"]),
+        }
+    return stats
+
+
+def merge_config_stats(local: Dict[str, Dict], remote: Optional[Dict[str, Dict]]) -> Dict[str, Dict]:
+    """
+    Combine statistics of the loaded runs with collection-wide statistics
+    from MongoDB. Types and ranges from the database take precedence; the
+    database statistics may cover a sample only, so the larger distinct count
+    wins. String values are the union of loaded values and the most frequent
+    ones.
+    """
+    if not remote:
+        return local
+    merged: Dict[str, Dict] = {}
+    for key in set(local) | set(remote):
+        mine = local.get(key, {})
+        theirs = remote.get(key, {})
+        type_name = theirs.get("type") if theirs.get("type") not in (None, "unknown") else mine.get("type", "unknown")
+        merged[key] = {
+            "type": type_name,
+            "count": max(theirs.get("count", 0), mine.get("count", 0)),
+            "strings": sorted(set(mine.get("strings", [])) | set(theirs.get("top", []))),
+            "min": theirs.get("min"),
+            "max": theirs.get("max"),
+        }
+    return merged
+
+
+def get_config_stats(session: Dict) -> Dict[str, Dict]:
+    """
+    Return per-key config statistics for the session runs.
+    Built once per connection and extended with runs appended since; merged
+    with the collection-wide statistics stored as "db_config_stats", if any.
+    """
+    runs = session.get("runs") or []
+    remote = session.get("db_config_stats")
+    lock = session.setdefault("stats_lock", threading.Lock())
+    with lock:
+        frame = session.get("config_stats")
+        if frame is None or frame["runs"] is not runs or frame["length"] > len(runs):
+            frame = {"runs": runs, "length": 0, "accumulators": {}, "summary": None, "remote": None}
+            session["config_stats"] = frame
+        if frame["length"] < len(runs) or frame["summary"] is None or frame["remote"] is not remote:
+            update_config_stats(frame["accumulators"], runs[frame["length"]:])
+            frame["length"] = len(runs)
+            frame["remote"] = remote
+            frame["summary"] = merge_config_stats(summarize_config_stats(frame["accumulators"]), remote)
+        return frame["summary"]
@@ -0,0 +1,251 @@
+"""
+Index advisor for the Sacred `runs` and `metrics` collections.
+
+Lists the indexes the queries of AltarExtractor benefit from, reports which
+ones exist together with the query plan MongoDB picks for a representative
+query, and can create the missing ones on request in a background thread.
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+import threading
+
+import pymongo
+
+from ..config import RUNS_BATCH_SIZE
+from ..state.clients import registry_key
+from .mongo import RUNS_PROJECTION, has_collection
+
+# Explain commands mirror the queries issued by the loaders: runs come in
+# batches sorted by _id (fetch_runs_batch), refreshes match an $or on
+# heartbeat/stop_time (fetch_runs_changed_since) and metric series are fetched
+# by _id in $in chunks (_iter_metric_chunks)
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _batch_command(filter_doc: Dict) -> Dict:
+    return {"find": "runs", "filter": filter_doc, "projection": RUNS_PROJECTION, "sort": {"_id": 1}, "limit": RUNS_BATCH_SIZE}
+
+
+_CHANGED_SINCE_COMMAND = _batch_command({"$or": [{"_id": {"$gt": 0}}, {"heartbeat": {"$gt": _EPOCH}}, {"stop_time": {"$gt": _EPOCH}}]})
+
+# (collection, index keys, representative query as an explain command, purpose)
+BASE_INDEXES: List[Tuple[str, List[Tuple[str, int]], Dict, str]] = [
+    (
+        "runs",
+        [("_id", pymongo.ASCENDING)],
+        _batch_command({"_id": {"$gt": 0}}),
+        "Loading runs in batches",
+    ),
+    (
+        "runs",
+        [("experiment.name", pymongo.ASCENDING), ("_id", pymongo.ASCENDING)],
+        _batch_command({"experiment.name": {"$in": [""]}, "_id": {"$gt": 0}}),
+        "Experiment names and runs of the scoped experiments",
+    ),
+    (
+        "runs",
+        [("heartbeat", pymongo.DESCENDING)],
+        _CHANGED_SINCE_COMMAND,
+        "Refresh of runs changed since the last sync",
+    ),
+    (
+        "runs",
+        [("stop_time", pymongo.DESCENDING)],
+        _CHANGED_SINCE_COMMAND,
+        "Refresh of runs finished since the last sync",
+    ),
+    (
+        "metrics",
+        [("_id", pymongo.ASCENDING)],
+        {"find": "metrics", "filter": {"_id": {"$in": []}}, "projection": {"values": 1, "steps": 1}},
+        "Metric series of the selected runs",
+    ),
+]
+
+
+def recommended_indexes(config_keys: Iterable[str] = ()) -> List[Dict]:
+    """
+    Return the recommended indexes, including one per filtered config key.
+    """
+    specs = [
+        {"collection": coll, "keys": keys, "explain": explain, "purpose": purpose}
+        for coll, keys, explain, purpose in BASE_INDEXES
+    ]
+    for key in sorted(set(k for k in config_keys or [] if isinstance(k, str) and k)):
+        if "." in key or key.startswith("$"):
+            continue
+        specs.append({
+            "collection": "runs",
+            "keys": [(f"config.{key}", pymongo.ASCENDING)],
+            "explain": _batch_command({f"config.{key}": {"$exists": True}}),
+            "purpose": f"Filtering on config key '{key}'",
+        })
+    return specs
+
+
+def index_name(keys: List[Tuple[str, int]]) -> str:
+    """
+    Return the default MongoDB name of an index, e.g. "experiment.name_1".
+    """
+    return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+
+def has_index(index_information: Dict, keys: List[Tuple[str, int]]) -> bool:
+    """
+    Return True if an existing index starts with the given fields, so it can
+    serve queries on them.
+    """
+    fields = [field for field, _ in keys]
+    for info in (index_information or {}).values():
+        existing = [field for field, _ in info.get("key", [])]
+        if existing[:len(fields)] == fields:
+            return True
+    return False
+
+
+def _plan_stages(plan: Dict) -> List[str]:
+    stages: List[str] = []
+    while isinstance(plan, dict) and plan:
+        stage = plan.get("stage", "?")
+        if plan.get("indexName"):
+            stage += f" ({plan['indexName']})"
+        stages.append(stage)
+        inputs = plan.get("inputStages") or []
+        plan = plan.get("inputStage") or (inputs[0] if inputs else None)
+    return stages
+
+
+def explain_plan(db, command: Dict) -> str:
+    """
+    Return the winning plan of a command as "STAGE <- STAGE (index)".
+    """
+    result = db.command("explain", command, verbosity="queryPlanner")
+    planner = result.get("queryPlanner") or {}
+    if not planner and result.get("stages"):
+        planner = (result["stages"][0].get("$cursor") or {}).get("queryPlanner") or {}
+    winning = planner.get("winningPlan") or {}
+    # Newer servers wrap the classic plan in "queryPlan"
+    winning = winning.get("queryPlan", winning)
+    stages = _plan_stages(winning)
+    return " <- ".join(stages) if stages else "unknown"
+
+
+def index_report(client: pymongo.MongoClient, database_name: str, config_keys: Iterable[str] = ()) -> List[Dict]:
+    """
+    Return one row per recommended index:
+    {"collection", "index", "exists", "plan", "purpose"}.
+    """
+    db = client[database_name]
+    info_by_collection: Dict[str, Dict] = {}
+    rows: List[Dict] = []
+    for spec in recommended_indexes(config_keys):
+        coll = spec["collection"]
+        if not has_collection(client, database_name, coll):
+            continue
+        if coll not in info_by_collection:
+            info_by_collection[coll] = db[coll].index_information()
+        try:
+            plan = explain_plan(db, spec["explain"])
+        except Exception as exc:
+            plan = f"explain failed: {exc}"
+        rows.append({
+            "collection": coll,
+            "index": index_name(spec["keys"]),
+            "exists": has_index(info_by_collection[coll], spec["keys"]),
+            "plan": plan,
+            "purpose": spec["purpose"],
+        })
+    return rows
+
+
+def missing_indexes(client: pymongo.MongoClient, database_name: str, config_keys: Iterable[str] = ()) -> List[Dict]:
+    """
+    Return the specs of the recommended indexes that do not exist yet.
+    """
+    db = client[database_name]
+    info_by_collection: Dict[str, Dict] = {}
+    missing: List[Dict] = []
+    for spec in recommended_indexes(config_keys):
+        coll = spec["collection"]
+        if not has_collection(client, database_name, coll):
+            continue
+        if coll not in info_by_collection:
+            info_by_collection[coll] = db[coll].index_information()
+        if not has_index(info_by_collection[coll], spec["keys"]):
+            missing.append(spec)
+    return missing
+
+
+def create_recommended_indexes(
+    client: pymongo.MongoClient, database_name: str, config_keys: Iterable[str] = ()
+) -> List[str]:
+    """
+    Create the recommended indexes that do not exist yet.
+    Returns the names of the created indexes.
+    """
+    db = client[database_name]
+    return [
+        db[spec["collection"]].create_index(spec["keys"], name=index_name(spec["keys"]))
+        for spec in missing_indexes(client, database_name, config_keys)
+    ]
+
+
+# (client registry key, database_name) -> progress of the last index build:
+# {"total", "created", "current", "finished", "error"}
+_BUILDS: Dict[Tuple[str, str], Dict] = {}
+_BUILDS_LOCK = threading.Lock()
+
+
+def _run_index_build(client: pymongo.MongoClient, database_name: str, specs: List[Dict], status: Dict) -> None:
+    db = client[database_name]
+    try:
+        for spec in specs:
+            name = index_name(spec["keys"])
+            with _BUILDS_LOCK:
+                status["current"] = f"{spec['collection']}.{name}"
+            db[spec["collection"]].create_index(spec["keys"], name=name)
+            with _BUILDS_LOCK:
+                status["created"].append(name)
+    except Exception as exc:
+        with _BUILDS_LOCK:
+            status["error"] = str(exc)
+    finally:
+        with _BUILDS_LOCK:
+            status["current"] = None
+            status["finished"] = True
+
+
+def start_index_build(client: pymongo.MongoClient, database_name: str, config_keys: Iterable[str] = ()) -> Dict:
+    """
+    Start creating the missing recommended indexes in a background thread,
+    unless a build is already running for this database, and return its
+    progress (see `index_build_status`).
+    """
+    key = (registry_key(client), database_name)
+    with _BUILDS_LOCK:
+        status = _BUILDS.get(key)
+        if status is not None and not status["finished"]:
+            return dict(status, created=list(status["created"]))
+    specs = missing_indexes(client, database_name, config_keys)
+    status = {"total": len(specs), "created": [], "current": None, "finished": not specs, "error": None}
+    with _BUILDS_LOCK:
+        running = _BUILDS.get(key)
+        if running is not None and not running["finished"]:
+            return dict(running, created=list(running["created"]))
+        _BUILDS[key] = status
+    if specs:
+        threading.Thread(
+            target=_run_index_build, args=(client, database_name, specs, status), name="altar-index-build", daemon=True
+        ).start()
+    return index_build_status(client, database_name)
+
+
+def index_build_status(client: pymongo.MongoClient, database_name: str) -> Optional[Dict]:
+    """
+    Return a copy of the progress of the last index build on a database:
+    {"total", "created", "current", "finished", "error"}, or None.
+    """
+    with _BUILDS_LOCK:
+        status = _BUILDS.get((registry_key(client), database_name))
+        return None if status is None else dict(status, created=list(status["created"]))
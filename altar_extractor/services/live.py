@@ -0,0 +1,231 @@
+"""
+Incremental and live updates of the runs loaded in a session.
+
+`sync_changed_runs` merges runs added or updated since the last sync into the
+session. For live tailing, a `ChangeWatcher` thread, shared by the sessions of
+a database, follows a MongoDB change stream on the `runs` and `metrics`
+collections and records which documents changed, so the periodic live callback
+only refetches those runs. Servers without change streams (standalone mongod)
+fall back to heartbeat polling, as do sessions while the stream opens.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+import threading
+
+from ..config import RUNS_BATCH_SIZE, RUNS_REFRESH_OVERLAP_S
+from ..state.metrics_cache import METRICS_CACHE
+from ..state.clients import registry_key
+from ..state.runs import find_sessions, merge_runs
+from .frame import get_config_stats, patch_config_rows
+from .metrics import metric_cache_key
+from .mongo import combine_queries, fetch_runs_changed_since
+from .projection import session_projection
+
+def sync_marker(started: datetime) -> datetime:
+    """
+    Heartbeat/stop_time threshold for the next sync of a sync started at `started`.
+    """
+    return started - timedelta(seconds=RUNS_REFRESH_OVERLAP_S)
+
+
+def sync_changed_runs(session: Dict, run_ids: Optional[List] = None) -> Tuple[Dict, List[Dict], List[Tuple[int, Dict]]]:
+    """
+    Fetch runs added since the last load and runs changed since the last sync
+    (or, when `run_ids` is given, those runs) and merge them into the session.
+    Returns (handle, runs, replaced) as from `merge_runs`.
+
+    At most RUNS_BATCH_SIZE runs are fetched per call. When more match, the
+    session records where to resume ("sync_resume_id"), keeps its last sync
+    time and is marked as loading, so the batch loader streams the rest.
+    """
+    started = datetime.now(timezone.utc)
+    resume_id = session.get("sync_resume_id")
+    since = None if run_ids is not None and resume_id is None else session.get("synced_at")
+    query = session.get("query")
+    if resume_id is not None:
+        query = combine_queries(query, {"_id": {"$gt": resume_id}})
+    runs, last_id = fetch_runs_changed_since(
+        session.get("client"),
+        session.get("database_name"),
+        session.get("last_id"),
+        since,
+        query=query,
+        run_ids=run_ids if resume_id is None else None,
+        projection=session_projection(session),
+        batch_size=RUNS_BATCH_SIZE,
+    )
+    if len(runs) >= RUNS_BATCH_SIZE:
+        # The remaining passes sync since the last sync time, which also
+        # covers the run IDs left out of this batch
+        updates = {"sync_resume_id": last_id, "sync_started": session.get("sync_started") or started, "done": False}
+    else:
+        updates = {"sync_resume_id": None, "sync_started": None, "synced_at": sync_marker(session.get("sync_started") or started), "done": True}
+    handle, replaced = merge_runs(session, runs, **updates)
+    stored = session.get("runs") or []
+    session["total"] = len(stored)
+    if len(runs) > len(replaced) and last_id is not None:
+        # Runs come sorted by _id; keep the largest _id seen
+        previous = session.get("last_id")
+        try:
+            session["last_id"] = last_id if previous is None else max(previous, last_id)
+        except TypeError:
+            session["last_id"] = last_id
+    # Sacred configs are fixed once a run starts; only rebuild rows that differ
+    patch_config_rows(session, stored, [i for i, previous in replaced if previous.get("config") != stored[i].get("config")])
+    get_config_stats(session)
+    return handle, runs, replaced
+
+
+class ChangeWatcher(threading.Thread):
+    """
+    Background thread collecting the IDs of changed runs and metric documents
+    from a database change stream, for every session subscribed to it.
+    `supported` stays None while the stream opens and becomes False when the
+    server does not offer change streams or the stream fails.
+    """
+
+    def __init__(self, client, database_name: str):
+        super().__init__(name="altar-change-watcher", daemon=True)
+        self.client = client
+        self.database_name = database_name
+        self.supported: Optional[bool] = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        # session token -> (changed run _ids, changed metric ids)
+        self._changes: Dict[str, Tuple[set, set]] = {}
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def subscribe(self, token: str) -> None:
+        with self._lock:
+            self._changes.setdefault(token, (set(), set()))
+
+    def unsubscribe(self, token: str) -> bool:
+        """
+        Stop recording changes for a session. Returns True when no session is
+        subscribed anymore.
+        """
+        with self._lock:
+            self._changes.pop(token, None)
+            return not self._changes
+
+    def drain(self, token: str) -> Tuple[List, List[str]]:
+        """
+        Return and clear the (run _ids, metric ids) changed since the last call
+        for a session.
+        """
+        with self._lock:
+            run_ids, metric_ids = self._changes.get(token) or (set(), set())
+            result = list(run_ids), list(metric_ids)
+            run_ids.clear()
+            metric_ids.clear()
+        return result
+
+    def _active(self) -> bool:
+        # Stop following the stream once every subscribed session is dropped or evicted
+        if self._stop_event.is_set():
+            return False
+        with self._lock:
+            tokens = list(self._changes)
+        return any(find_sessions(token=token) for token in tokens)
+
+    def run(self) -> None:
+        pipeline = [
+            {"$match": {
+                "ns.coll": {"$in": ["runs", "metrics"]},
+                "operationType": {"$in": ["insert", "update", "replace"]},
+            }},
+            {"$project": {"ns": 1, "documentKey": 1}},
+        ]
+        try:
+            with self.client[self.database_name].watch(pipeline, max_await_time_ms=1000) as stream:
+                self.supported = True
+                while self._active() and stream.alive:
+                    change = stream.try_next()
+                    if change is None:
+                        continue
+                    doc_id = (change.get("documentKey") or {}).get("_id")
+                    is_run = (change.get("ns") or {}).get("coll") == "runs"
+                    with self._lock:
+                        for run_ids, metric_ids in self._changes.values():
+                            if is_run:
+                                run_ids.add(doc_id)
+                            else:
+                                metric_ids.add(str(doc_id))
+        except Exception:
+            # e.g. standalone servers: "$changeStream is only supported on replica sets"
+            self.supported = False
+        finally:
+            if self.supported is None:
+                self.supported = False
+
+
+# (client registry key, database_name) -> change watcher shared by the sessions
+# of that database
+_WATCHERS: Dict[Tuple[str, str], ChangeWatcher] = {}
+_WATCHERS_LOCK = threading.Lock()
+
+
+def _watcher_key(session: Dict) -> Tuple[str, str]:
+    return session.get("client_key") or registry_key(session.get("client")), session.get("database_name")
+
+
+def ensure_watcher(session: Dict) -> Optional[ChangeWatcher]:
+    """
+    Subscribe a session to the change watcher of its database, starting it if
+    needed, and return it. Returns None while the stream is still opening or
+    when change streams are unavailable and polling should be used.
+    """
+    key = _watcher_key(session)
+    with _WATCHERS_LOCK:
+        watcher = _WATCHERS.get(key)
+        # A stream that ended is reopened; an unsupported one keeps sessions
+        # polling until the client is replaced
+        if watcher is None or (not watcher.is_alive() and (watcher.supported or watcher.client is not session.get("client"))):
+            watcher = ChangeWatcher(session.get("client"), session.get("database_name"))
+            _WATCHERS[key] = watcher
+            watcher.start()
+        watcher.subscribe(session.get("token"))
+    if watcher.supported and watcher.is_alive():
+        return watcher
+    return None
+
+
+def stop_watcher(session: Optional[Dict]) -> None:
+    """
+    Unsubscribe a session from its change watcher, stopping the watcher once
+    no session follows it.
+    """
+    if not session:
+        return
+    key = _watcher_key(session)
+    with _WATCHERS_LOCK:
+        watcher = _WATCHERS.get(key)
+        if watcher is not None and watcher.unsubscribe(session.get("token")):
+            watcher.stop()
+            _WATCHERS.pop(key, None)
+    session.pop("watching", None)
+
+
+def sync_live_changes(session: Dict) -> Tuple[Optional[Dict], List[Dict], List[Tuple[int, Dict]], bool]:
+    """
+    Apply live changes to a session: the documents reported by its change
+    stream, or every run changed since the last sync when polling.
+    Returns (handle, runs, replaced, metrics_changed); handle is None when no
+    run changed, and metrics_changed tells whether metric series changed.
+    """
+    watcher = ensure_watcher(session)
+    if watcher is None or session.get("watching") is not watcher:
+        # Polling, or catching up on what changed before the stream opened
+        session["watching"] = watcher
+        handle, runs, replaced = sync_changed_runs(session)
+        return (handle if runs else None), runs, replaced, False
+
+    run_ids, metric_ids = watcher.drain(session.get("token"))
+    for metric_id in metric_ids:
+        METRICS_CACHE.invalidate(metric_cache_key(session, metric_id))
+    if not run_ids:
+        return None, [], [], bool(metric_ids)
+    return (*sync_changed_runs(session, run_ids=run_ids), bool(metric_ids))
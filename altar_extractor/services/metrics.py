@@ -0,0 +1,252 @@
+"""
+Metric series helpers for AltarExtractor.
+
+Metric values are fetched on demand: only for the metrics ticked in the UI and
+only for runs passing the current filters. Series of finished runs are served
+from the process-wide METRICS_CACHE.
+"""
+
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from bson import ObjectId
+
+from .downsample import downsample_series
+from .mongo import fetch_metrics_values_strided, iter_metrics_values
+from ..state.metrics_cache import METRICS_CACHE
+
+# Run statuses whose metric documents may still change
+LIVE_RUN_STATUSES = ("RUNNING", "QUEUED")
+
+
+def extract_metric_id_for_run(run_metrics, metric_name: str) -> Optional[str]:
+    """
+    Return the metric document ID a run references for a metric name.
+    Handles both dict ({name: {"id": ...}}) and list ([{"name", "id"}]) layouts.
+    """
+    if isinstance(run_metrics, dict):
+        v = run_metrics.get(metric_name, None)
+        if isinstance(v, dict) and v.get("id") is not None:
+            return str(v.get("id"))
+        if isinstance(v, (str, ObjectId)):
+            return str(v)
+        return None
+    if isinstance(run_metrics, list):
+        for item in run_metrics:
+            if isinstance(item, dict) and item.get("name") == metric_name:
+                mid = item.get("id") or item.get("_id")
+                if mid is not None:
+                    return str(mid)
+                return None
+    return None
+
+
+def metric_ids_for_runs(runs: List[Dict], metric_names: List[str]) -> List[str]:
+    """
+    Return the metric document IDs referenced by runs for the given metric names.
+    """
+    ids = []
+    seen = set()
+    for run in runs or []:
+        run_metrics = run.get("metrics", None)
+        for mname in metric_names or []:
+            mid = extract_metric_id_for_run(run_metrics, mname)
+            if mid and mid not in seen:
+                seen.add(mid)
+                ids.append(mid)
+    return ids
+
+
+def metric_cache_key(session: Dict, metric_id: str) -> str:
+    """
+    Return the METRICS_CACHE key of a metric document of a session's database.
+    Metric IDs are only unique within a database, so the key is scoped to the
+    client (connection URI hash) and database name.
+    """
+    return f"{session.get('client_key')}/{session.get('database_name')}/{metric_id}"
+
+
+def ensure_metric_values(
+    session: Dict,
+    runs: List[Dict],
+    metric_names: List[str],
+    downsample_mode: str = "none",
+    downsample_points: int = 0,
+) -> Dict[str, Dict]:
+    """
+    Return {metric_id: {"values", "steps"}} for the selected metrics of `runs`.
+    Series of finished runs come from METRICS_CACHE when possible and are
+    added to it after fetching; series of live runs are always fetched.
+    In "stride" downsampling mode, uncached series are reduced by MongoDB and
+    not cached, since they are partial.
+    """
+    client = session.get("client")
+    if client is None or not metric_names:
+        return {}
+
+    cacheable = set()
+    wanted: List[str] = []
+    for run in runs or []:
+        ids = metric_ids_for_runs([run], metric_names)
+        wanted.extend(ids)
+        if run.get("status") not in LIVE_RUN_STATUSES:
+            cacheable.update(ids)
+
+    cached = METRICS_CACHE.get_many([metric_cache_key(session, mid) for mid in wanted if mid in cacheable])
+    values = {mid: cached[metric_cache_key(session, mid)] for mid in wanted if metric_cache_key(session, mid) in cached}
+    missing = list(dict.fromkeys(mid for mid in wanted if mid not in values))
+    if missing and downsample_mode == "stride" and downsample_points and int(downsample_points) > 0:
+        values.update(fetch_metrics_values_strided(client, session.get("database_name"), missing, int(downsample_points)))
+    elif missing:
+        # Chunks are streamed straight into the cache and the result
+        for mid, payload in iter_metrics_values(client, session.get("database_name"), missing):
+            if mid in cacheable:
+                METRICS_CACHE.put(metric_cache_key(session, mid), payload)
+            values[mid] = payload
+    return values
+
+
+def metric_series_for_run(
+    run_metrics,
+    metric_name: str,
+    values_map: Dict[str, Dict],
+    downsample_mode: str = "none",
+    downsample_points: int = 0,
+) -> Tuple[List, List]:
+    """
+    Return the (steps, values) series of one metric of a run, downsampled.
+    Steps default to the point index when the metric has none.
+    """
+    mid = extract_metric_id_for_run(run_metrics, metric_name)
+    payload = values_map.get(str(mid), {}) if mid else {}
+    values = payload.get("values") or []
+    steps = payload.get("steps") or list(range(len(values)))
+    return downsample_series(steps, values, downsample_mode, downsample_points)
+
+
+def metrics_steps_table(
+    runs: List[Dict],
+    values_map: Dict[str, Dict],
+    metric_names: List[str],
+    config_keys: List[str],
+    steps_as_columns: bool = False,
+    downsample_mode: str = "none",
+    downsample_points: int = 0,
+) -> Tuple[List[Dict], int, Callable[..., Dict[str, List]]]:
+    """
+    Build the metric steps table column by column: one row per run and step
+    with a column per metric, or with `steps_as_columns` one row per run and
+    metric with a column per step. Returns (columns, row_count, column_range),
+    where `column_range(start, stop)` lazily builds rows `start:stop` only, as
+    {column id: values}, so pages and exports skip the rest. Missing values
+    are None. Config keys clashing with the generated columns are left out.
+    """
+    def reserved(key: str) -> bool:
+        if key in ("run_id", "experiment"):
+            return True
+        if steps_as_columns:
+            return key == "metric_name" or key.startswith("step:")
+        return key == "step" or key.startswith("metric:")
+
+    config_keys = [key for key in config_keys if not reserved(key)]
+
+    run_data = []
+    all_step_values = set()
+    for run in runs:
+        base = {"run_id": run.get("run_id", ""), "experiment": run.get("experiment", "")}
+        cfg = run.get("config", {}) or {}
+        for key in config_keys:
+            base[key] = cfg.get(key)
+
+        run_metrics = run.get("metrics", None)
+        step_grid = None
+        metric_series: Dict[str, List] = {}
+        metric_steps: Dict[str, List] = {}
+        for mname in metric_names:
+            steps, values = metric_series_for_run(run_metrics, mname, values_map, downsample_mode, downsample_points)
+            metric_series[mname] = values
+            metric_steps[mname] = steps
+            if steps_as_columns:
+                all_step_values.update(steps)
+            if steps and (step_grid is None or len(steps) > len(step_grid)):
+                step_grid = steps
+        if step_grid is None:
+            continue
+        run_data.append({"base": base, "step_grid": step_grid, "metric_series": metric_series, "metric_steps": metric_steps})
+
+    columns = [{"name": "run_id", "id": "run_id"}, {"name": "Experiment", "id": "experiment"}]
+    columns += [{"name": key, "id": key} for key in config_keys]
+
+    if steps_as_columns:
+        sorted_steps = sorted(all_step_values)
+        columns.append({"name": "Metric", "id": "metric_name"})
+        for step_val in sorted_steps:
+            columns.append({"name": str(step_val), "id": f"step:{step_val}"})
+        row_count = len(run_data) * len(metric_names)
+    else:
+        columns.append({"name": "Step", "id": "step"})
+        for mname in metric_names:
+            columns.append({"name": mname, "id": f"metric:{mname}"})
+        row_count = sum(len(rd["step_grid"]) for rd in run_data)
+
+    def column_range(start: int = 0, stop: Optional[int] = None) -> Dict[str, List]:
+        first = max(int(start or 0), 0)
+        last = row_count if stop is None else min(max(int(stop), first), row_count)
+        data: Dict[str, List] = {col["id"]: [] for col in columns}
+        if steps_as_columns:
+            by_metric(data, first, last)
+        else:
+            by_step(data, first, last)
+        return data
+
+    def by_metric(data: Dict[str, List], first: int, last: int) -> None:
+        per_run = len(metric_names)
+        for index in range(first, last):
+            rd = run_data[index // per_run]
+            mname = metric_names[index % per_run]
+            for col, value in rd["base"].items():
+                data[col].append(value)
+            data["metric_name"].append(mname)
+            step_to_value = dict(zip(rd["metric_steps"].get(mname, []), rd["metric_series"].get(mname, [])))
+            for step_val in sorted_steps:
+                data[f"step:{step_val}"].append(step_to_value.get(step_val))
+
+    def by_step(data: Dict[str, List], first: int, last: int) -> None:
+        offset = 0
+        for rd in run_data:
+            n_steps = len(rd["step_grid"])
+            # Whole runs before the requested range are skipped
+            if offset + n_steps <= first:
+                offset += n_steps
+                continue
+            if offset >= last:
+                return
+            lo, hi = max(first - offset, 0), min(last - offset, n_steps)
+            for col, value in rd["base"].items():
+                data[col].extend([value] * (hi - lo))
+            data["step"].extend(rd["step_grid"][lo:hi])
+            for mname in metric_names:
+                series = list(rd["metric_series"].get(mname, [])[lo:hi])
+                data[f"metric:{mname}"].extend(series + [None] * (hi - lo - len(series)))
+            offset += n_steps
+
+    return columns, row_count, column_range
+
+
+def iter_column_rows(
+    column_range: Callable[..., Dict[str, List]], start: int = 0, stop: Optional[int] = None, chunk_rows: int = 1000
+) -> Iterator[Dict]:
+    """
+    Yield rows `start:stop` of a table built by `metrics_steps_table` as dicts,
+    building `chunk_rows` rows at a time.
+    """
+    index = max(int(start or 0), 0)
+    while stop is None or index < stop:
+        end = index + chunk_rows if stop is None else min(index + chunk_rows, stop)
+        data = column_range(index, end)
+        n = len(next(iter(data.values()), []))
+        ids = list(data)
+        for i in range(n):
+            yield {col: data[col][i] for col in ids}
+        if n < end - index:
+            return
+        index = end
@@ -2,9 +2,75 @@
 MongoDB service functions for AltarExtractor.
 """
 
-from typing import Dict, List, Optional
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 from bson import ObjectId
+import json
 import pymongo
+import threading
+import time
+
+from ..config import (
+    RUNS_BATCH_SIZE,
+    CONFIG_STATS_TTL,
+    CONFIG_STATS_TOP_N,
+    CONFIG_STATS_SAMPLE_SIZE,
+    SCHEMA_PROBE_TTL,
+    CONFIG_KEYS_SAMPLE_SIZE,
+    CONFIG_KEYS_TTL,
+    MONGO_QUERY_WORKERS,
+    METRICS_FETCH_CHUNK_SIZE,
+    METRICS_FETCH_CONCURRENCY,
+)
+from ..state.clients import registry_key
+
+# Sacred collections the app reads
+SACRED_COLLECTIONS = ("runs", "metrics")
+
+# BSON type names reported by $type, mapped to the filter types used in the UI
+BSON_TYPE_NAMES = {
+    "bool": "boolean",
+    "int": "number",
+    "long": "number",
+    "double": "number",
+    "decimal": "number",
+    "string": "string",
+    "array": "list",
+    "object": "dict",
+}
+
+# (client registry key, database_name, top_n, sample_size, query) -> (timestamp, stats),
+# least recently used first
+_CONFIG_STATS_CACHE: "OrderedDict[Tuple, Tuple[float, Dict[str, Dict]]]" = OrderedDict()
+_CONFIG_STATS_LOCK = threading.Lock()
+
+# Config key statistics kept at most
+CONFIG_STATS_CACHE_MAX_ENTRIES = 64
+
+# (client registry key, database_name, query) -> {"keys", "last_id", "time"}
+# config key catalogs, least recently used first
+_CONFIG_KEYS_CACHE: "OrderedDict[Tuple, Dict]" = OrderedDict()
+_CONFIG_KEYS_LOCK = threading.Lock()
+
+# Config key catalogs kept at most
+CONFIG_KEYS_CACHE_MAX_ENTRIES = 64
+
+# (client registry key, database_name) -> (timestamp, present Sacred collections)
+_SCHEMA_CACHE: Dict[Tuple, Tuple[float, frozenset]] = {}
+_SCHEMA_LOCK = threading.Lock()
+
+
+# Shared pool for independent queries; pymongo clients are thread-safe
+_QUERY_EXECUTOR = ThreadPoolExecutor(max_workers=max(MONGO_QUERY_WORKERS, 1), thread_name_prefix="mongo-query")
+
+
+def submit_query(fn: Callable, *args, **kwargs) -> Future:
+    """
+    Run a MongoDB query function on the shared query pool and return its future.
+    Queries submitted together wait on their round trips concurrently.
+    """
+    return _QUERY_EXECUTOR.submit(fn, *args, **kwargs)
 
 
 def build_mongodb_uri(
@@ -44,6 +110,58 @@ def build_mongodb_uri(
     return f"mongodb://{resolved_username}:{resolved_password}@{resolved_host}:{resolved_port}/"
 
 
+def probe_collections(client: pymongo.MongoClient, database_name: str, refresh: bool = False) -> frozenset:
+    """
+    Return which Sacred collections exist in a database.
+    Only those collection names are listed, and the result is cached for
+    SCHEMA_PROBE_TTL seconds; `refresh` forces a new listing.
+    """
+    # Keyed like the other caches by client: `client.nodes` is empty until
+    # server discovery and ignores credentials
+    cache_key = (registry_key(client), database_name)
+    if not refresh:
+        with _SCHEMA_LOCK:
+            cached = _SCHEMA_CACHE.get(cache_key)
+        if cached is not None and time.monotonic() - cached[0] < SCHEMA_PROBE_TTL:
+            return cached[1]
+    pattern = "^(" + "|".join(SACRED_COLLECTIONS) + ")$"
+    names = client[database_name].list_collection_names(filter={"name": {"$regex": pattern}})
+    present = frozenset(names)
+    with _SCHEMA_LOCK:
+        _SCHEMA_CACHE[cache_key] = (time.monotonic(), present)
+    return present
+
+
+def has_collection(client: pymongo.MongoClient, database_name: str, name: str) -> bool:
+    """
+    Return True if a Sacred collection exists, using the cached schema probe.
+    """
+    return name in probe_collections(client, database_name)
+
+
+def combine_queries(*queries: Optional[Dict]) -> Dict:
+    """
+    AND together the non-empty queries; returns {} when there are none.
+    """
+    parts = [q for q in queries if q]
+    if not parts:
+        return {}
+    if len(parts) == 1:
+        return dict(parts[0])
+    return {"$and": parts}
+
+
+def experiment_scope_query(experiment_names: Optional[List[str]]) -> Optional[Dict]:
+    """
+    Return the runs query restricting them to the given experiment names, or
+    None for all experiments.
+    """
+    names = sorted(set(n for n in experiment_names or [] if isinstance(n, str) and n))
+    if not names:
+        return None
+    return {"experiment.name": {"$in": names}}
+
+
 def fetch_sacred_experiment_names(
     client: pymongo.MongoClient, database_name: str
 ) -> List[str]:
@@ -52,64 +170,345 @@ def fetch_sacred_experiment_names(
     Sacred's MongoObserver stores runs in the 'runs' collection with the field 'experiment.name'.
     """
     db = client[database_name]
-    if "runs" not in db.list_collection_names():
+    if not has_collection(client, database_name, "runs"):
         return []
     names = db["runs"].distinct("experiment.name")
     cleaned = sorted([n for n in names if isinstance(n, str) and n.strip()])
     return cleaned
 
 
-def fetch_config_keys(client: pymongo.MongoClient, database_name: str) -> List[str]:
+def _config_runs_stages(match: Optional[Dict], sample_size: int = 0) -> List[Dict]:
+    # Runs with a config document, optionally a random sample of them
+    stages: List[Dict] = []
+    if sample_size > 0 and not match:
+        # $sample as the first stage reads random documents without a scan
+        stages.append({"$sample": {"size": sample_size}})
+        stages.append({"$match": {"config": {"$type": "object"}}})
+    else:
+        stages.append({"$match": combine_queries({"config": {"$type": "object"}}, match)})
+        if sample_size > 0:
+            stages.append({"$sample": {"size": sample_size}})
+    return stages
+
+
+def _config_keys_pipeline(match: Dict, sample_size: int = 0) -> List[Dict]:
+    stages = _config_runs_stages(match, sample_size)
+    stages += [
+        {"$project": {"cfg": {"$objectToArray": "$config"}}},
+        {"$unwind": "$cfg"},
+        {"$group": {"_id": "$cfg.k"}},
+    ]
+    return stages
+
+
+def fetch_config_keys(
+    client: pymongo.MongoClient,
+    database_name: str,
+    query: Optional[Dict] = None,
+    sample_size: int = CONFIG_KEYS_SAMPLE_SIZE,
+    use_cache: bool = True,
+) -> List[str]:
     """
-    Return sorted list of distinct top-level keys found in the 'config' field of Sacred runs.
+    Return sorted list of distinct top-level keys found in the 'config' field of Sacred runs,
+    optionally restricted to the runs matching `query`.
+
+    Keys are kept in a catalog per database and query: the first call scans the
+    matching runs (or a `$sample` of `sample_size` of them), later calls only
+    scan runs with a larger _id. The catalog is rebuilt after CONFIG_KEYS_TTL
+    seconds.
     """
     db = client[database_name]
-    if "runs" not in db.list_collection_names():
+    if not has_collection(client, database_name, "runs"):
         return []
-    pipeline = [
-        {"$match": {"config": {"$type": "object"}}},
+    cache_key = (registry_key(client), database_name, json.dumps(query or {}, sort_keys=True, default=str))
+    with _CONFIG_KEYS_LOCK:
+        entry = _CONFIG_KEYS_CACHE.get(cache_key) if use_cache else None
+    if entry is not None and time.monotonic() - entry["time"] >= CONFIG_KEYS_TTL:
+        entry = None
+
+    newest = next(db["runs"].find(query or {}, {"_id": 1}).sort("_id", pymongo.DESCENDING).limit(1), None)
+    newest_id = newest.get("_id") if newest else None
+    if entry is None:
+        match = combine_queries(query, {"_id": {"$lte": newest_id}} if newest_id is not None and sample_size <= 0 else None)
+        keys = {doc["_id"] for doc in db["runs"].aggregate(_config_keys_pipeline(match, max(int(sample_size), 0)), allowDiskUse=True)}
+        entry = {"keys": keys, "last_id": newest_id, "time": time.monotonic()}
+    elif newest_id is not None and (entry["last_id"] is None or newest_id != entry["last_id"]):
+        # Only runs added since the catalog was last updated
+        match = combine_queries(query, {"_id": {"$gt": entry["last_id"]}} if entry["last_id"] is not None else None)
+        new_keys = {doc["_id"] for doc in db["runs"].aggregate(_config_keys_pipeline(match), allowDiskUse=True)}
+        entry = {"keys": entry["keys"] | new_keys, "last_id": newest_id, "time": entry["time"]}
+    with _CONFIG_KEYS_LOCK:
+        _CONFIG_KEYS_CACHE[cache_key] = entry
+        _CONFIG_KEYS_CACHE.move_to_end(cache_key)
+        while len(_CONFIG_KEYS_CACHE) > CONFIG_KEYS_CACHE_MAX_ENTRIES:
+            _CONFIG_KEYS_CACHE.popitem(last=False)
+    return sorted(k for k in entry["keys"] if isinstance(k, str))
+
+
+def fetch_config_key_stats(
+    client: pymongo.MongoClient,
+    database_name: str,
+    top_n: int = CONFIG_STATS_TOP_N,
+    use_cache: bool = True,
+    query: Optional[Dict] = None,
+    sample_size: int = CONFIG_STATS_SAMPLE_SIZE,
+) -> Dict[str, Dict]:
+    """
+    Compute per-key statistics of the 'config' field of the 'runs' collection
+    (or of a `$sample` of `sample_size` runs) in a single aggregation.
+    Returns {key: {"type", "count", "types", "min", "max", "top"}} where "type"
+    is the UI filter type ("mixed" when several are present), "count" the
+    number of distinct non-null values (values of different types, e.g. 1 and
+    1.0, count separately as in the local statistics), "types" a histogram of
+    BSON types,
+    "min"/"max" the numeric range and "top" the most frequent string values.
+    `query` restricts the statistics to matching runs (e.g. an experiment scope).
+    Results are cached per client, database and query for CONFIG_STATS_TTL
+    seconds; the client key keeps users with different credentials apart.
+    """
+    sample_size = max(int(sample_size or 0), 0)
+    cache_key = (registry_key(client), database_name, top_n, sample_size, json.dumps(query or {}, sort_keys=True, default=str))
+    if use_cache:
+        with _CONFIG_STATS_LOCK:
+            cached = _CONFIG_STATS_CACHE.get(cache_key)
+            if cached is not None:
+                _CONFIG_STATS_CACHE.move_to_end(cache_key)
+        if cached is not None and time.monotonic() - cached[0] < CONFIG_STATS_TTL:
+            return cached[1]
+
+    db = client[database_name]
+    if not has_collection(client, database_name, "runs"):
+        return {}
+    pipeline = _config_runs_stages(query, sample_size) + [
         {"$project": {"cfg": {"$objectToArray": "$config"}}},
         {"$unwind": "$cfg"},
-        {"$group": {"_id": "$cfg.k"}},
-        {"$project": {"_id": 0, "k": "$_id"}},
-        {"$sort": {"k": 1}},
+        {"$project": {"k": "$cfg.k", "v": "$cfg.v", "t": {"$type": "$cfg.v"}}},
+        {"$facet": {
+            "types": [
+                {"$group": {"_id": {"k": "$k", "t": "$t"}, "n": {"$sum": 1}}},
+            ],
+            "distinct": [
+                {"$match": {"t": {"$ne": "null"}}},
+                # $group compares numbers by value; keep the type like Python does
+                # (int and long both load as int)
+                {"$group": {"_id": {
+                    "k": "$k",
+                    "v": "$v",
+                    "t": {"$cond": [{"$eq": ["$t", "long"]}, "int", "$t"]},
+                }}},
+                {"$group": {"_id": "$_id.k", "n": {"$sum": 1}}},
+            ],
+            "numeric": [
+                {"$match": {"t": {"$in": ["int", "long", "double", "decimal"]}}},
+                {"$group": {"_id": "$k", "min": {"$min": "$v"}, "max": {"$max": "$v"}}},
+            ],
+            "strings": [
+                {"$match": {"t": "string"}},
+                {"$group": {"_id": {"k": "$k", "v": "$v"}, "n": {"$sum": 1}}},
+                {"$sort": {"n": -1, "_id.v": 1}},
+                {"$group": {"_id": "$_id.k", "top": {"$push": "$_id.v"}}},
+                {"$project": {"top": {"$slice": ["$top", max(int(top_n), 0)]}}},
+            ],
+        }},
     ]
-    keys = [doc["k"] for doc in db["runs"].aggregate(pipeline)]
-    return keys
+    facets = next(db["runs"].aggregate(pipeline, allowDiskUse=True), {}) or {}
+
+    stats: Dict[str, Dict] = {}
+
+    def entry(key: str) -> Dict:
+        return stats.setdefault(key, {"type": "unknown", "count": 0, "types": {}, "min": None, "max": None, "top": []})
+
+    for doc in facets.get("types", []):
+        ident = doc.get("_id") or {}
+        entry(ident.get("k"))["types"][ident.get("t")] = doc.get("n", 0)
+    for doc in facets.get("distinct", []):
+        entry(doc.get("_id"))["count"] = doc.get("n", 0)
+    for doc in facets.get("numeric", []):
+        item = entry(doc.get("_id"))
+        item["min"] = doc.get("min")
+        item["max"] = doc.get("max")
+    for doc in facets.get("strings", []):
+        entry(doc.get("_id"))["top"] = [v for v in doc.get("top", []) if isinstance(v, str)]
+
+    for item in stats.values():
+        ui_types = {BSON_TYPE_NAMES.get(t, "unknown") for t in item["types"] if t != "null"}
+        if len(ui_types) == 1:
+            item["type"] = next(iter(ui_types))
+        elif len(ui_types) > 1:
+            item["type"] = "mixed"
+
+    now = time.monotonic()
+    with _CONFIG_STATS_LOCK:
+        _CONFIG_STATS_CACHE[cache_key] = (now, stats)
+        _CONFIG_STATS_CACHE.move_to_end(cache_key)
+        for key in [k for k, (stamp, _) in _CONFIG_STATS_CACHE.items() if now - stamp >= CONFIG_STATS_TTL]:
+            del _CONFIG_STATS_CACHE[key]
+        while len(_CONFIG_STATS_CACHE) > CONFIG_STATS_CACHE_MAX_ENTRIES:
+            _CONFIG_STATS_CACHE.popitem(last=False)
+    return stats
 
 
-def fetch_runs_docs(client: pymongo.MongoClient, database_name: str, limit: int = 500) -> List[Dict]:
+def run_doc_to_row(doc: Dict) -> Dict:
     """
-    Fetch a subset of runs with experiment name and config for table rendering.
+    Convert a raw Sacred run document into the flat dict used by the app.
+    """
+    run_id = str(doc.get("_id"))
+    exp_name = None
+    exp = doc.get("experiment")
+    if isinstance(exp, dict):
+        exp_name = exp.get("name")
+    if not isinstance(exp_name, str):
+        exp_name = ""
+    cfg = doc.get("config")
+    cfg = cfg if isinstance(cfg, dict) else {}
+    status = doc.get("status")
+    info = doc.get("info") if isinstance(doc.get("info", {}), dict) else {}
+    metrics = (info or {}).get("metrics", None)
+    result = (info or {}).get("result", None)
+    return {
+        "run_id": run_id,
+        "experiment": exp_name,
+        "status": status if isinstance(status, str) else "",
+        "config": cfg,
+        "metrics": metrics,
+        "result": result
+    }
+
+
+RUNS_PROJECTION = {"_id": 1, "experiment.name": 1, "status": 1, "config": 1, "info.metrics": 1, "info.result": 1}
+
+
+def runs_projection(config_fields=None) -> Dict:
+    """
+    Return the run projection loading only the given top-level config keys,
+    or the whole config when `config_fields` is None. Keys that cannot be
+    projected as a field path ("." or a leading "$") load the whole config.
+    """
+    if config_fields is None or any("." in k or k.startswith("$") for k in config_fields):
+        return RUNS_PROJECTION
+    projection = {k: v for k, v in RUNS_PROJECTION.items() if k != "config"}
+    for key in sorted(config_fields):
+        projection[f"config.{key}"] = 1
+    return projection
+
+
+def count_runs(client: pymongo.MongoClient, database_name: str, query: Optional[Dict] = None) -> int:
+    """
+    Return the number of runs matching a query (or the whole collection).
     """
     db = client[database_name]
-    if "runs" not in db.list_collection_names():
-        return []
-    cursor = db["runs"].find(
-        {},
-        {"_id": 1, "experiment.name": 1, "config": 1, "info.metrics": 1, "info.result": 1}
-    ).limit(limit)
+    if not has_collection(client, database_name, "runs"):
+        return 0
+    if not query:
+        return db["runs"].estimated_document_count()
+    return db["runs"].count_documents(query)
+
+
+def fetch_runs_batch(
+    client: pymongo.MongoClient,
+    database_name: str,
+    batch_size: int = RUNS_BATCH_SIZE,
+    after_id: Any = None,
+    query: Optional[Dict] = None,
+    projection: Optional[Dict] = None,
+) -> Tuple[List[Dict], Any]:
+    """
+    Fetch one batch of runs ordered by _id, starting after `after_id`.
+    Returns (runs, last_raw_id); last_raw_id is None when the batch is empty.
+    """
+    db = client[database_name]
+    if not has_collection(client, database_name, "runs"):
+        return [], None
+    match = combine_queries(query, {"_id": {"$gt": after_id}} if after_id is not None else None)
+    cursor = (
+        db["runs"]
+        .find(match, projection or RUNS_PROJECTION)
+        .sort("_id", pymongo.ASCENDING)
+        .limit(max(int(batch_size), 1))
+    )
+    runs: List[Dict] = []
+    last_id = None
+    for doc in cursor:
+        last_id = doc.get("_id")
+        runs.append(run_doc_to_row(doc))
+    return runs, last_id
+
+
+def fetch_runs_changed_since(
+    client: pymongo.MongoClient,
+    database_name: str,
+    after_id: Any = None,
+    since: Any = None,
+    query: Optional[Dict] = None,
+    run_ids: Optional[List] = None,
+    projection: Optional[Dict] = None,
+    batch_size: int = RUNS_BATCH_SIZE,
+) -> Tuple[List[Dict], Any]:
+    """
+    Fetch up to `batch_size` runs inserted after `after_id`, or whose heartbeat
+    or stop_time is newer than `since` (a UTC datetime), or whose raw _id is in
+    `run_ids`, ordered by _id. A full batch means more runs may match; resume
+    by adding {"_id": {"$gt": last_raw_id}} to `query`.
+    Returns (runs, last_raw_id); last_raw_id is None when nothing matched.
+    """
+    db = client[database_name]
+    if not has_collection(client, database_name, "runs"):
+        return [], None
+    match: Dict = {}
+    if after_id is not None:
+        clauses: List[Dict] = [{"_id": {"$gt": after_id}}]
+        if since is not None:
+            clauses += [{"heartbeat": {"$gt": since}}, {"stop_time": {"$gt": since}}]
+        if run_ids:
+            clauses.append({"_id": {"$in": list(run_ids)}})
+        match = {"$or": clauses}
+    match = combine_queries(query, match)
     runs: List[Dict] = []
+    last_id = None
+    cursor = (
+        db["runs"]
+        .find(match, projection or RUNS_PROJECTION)
+        .sort("_id", pymongo.ASCENDING)
+        .limit(max(int(batch_size), 1))
+    )
     for doc in cursor:
-        run_id = str(doc.get("_id"))
-        exp_name = None
-        exp = doc.get("experiment")
-        if isinstance(exp, dict):
-            exp_name = exp.get("name")
-        if not isinstance(exp_name, str):
-            exp_name = ""
-        cfg = doc.get("config")
-        cfg = cfg if isinstance(cfg, dict) else {}
-        info = doc.get("info") if isinstance(doc.get("info", {}), dict) else {}
-        metrics = (info or {}).get("metrics", None)
-        result = (info or {}).get("result", None)
-        runs.append({
-            "run_id": run_id,
-            "experiment": exp_name,
-            "config": cfg,
-            "metrics": metrics,
-            "result": result
-        })
+        last_id = doc.get("_id")
+        runs.append(run_doc_to_row(doc))
+    return runs, last_id
+
+
+def iter_runs_docs(
+    client: pymongo.MongoClient,
+    database_name: str,
+    batch_size: int = RUNS_BATCH_SIZE,
+    after_id: Any = None,
+    query: Optional[Dict] = None,
+    projection: Optional[Dict] = None,
+) -> Iterator[List[Dict]]:
+    """
+    Yield runs in batches of `batch_size`, ordered by _id.
+    Each batch is a fresh query resuming after the last seen _id, so no server
+    cursor is held open between batches.
+    """
+    while True:
+        runs, last_id = fetch_runs_batch(client, database_name, batch_size, after_id, query, projection)
+        if runs:
+            yield runs
+        if last_id is None or len(runs) < batch_size:
+            return
+        after_id = last_id
+
+
+def fetch_runs_docs(client: pymongo.MongoClient, database_name: str, limit: Optional[int] = None) -> List[Dict]:
+    """
+    Fetch runs with experiment name and config for table rendering.
+    All runs are returned unless `limit` is given.
+    """
+    runs: List[Dict] = []
+    for batch in iter_runs_docs(client, database_name):
+        runs.extend(batch)
+        if limit is not None and len(runs) >= limit:
+            return runs[:limit]
     return runs
 
 
@@ -119,7 +518,7 @@ def fetch_metrics_list(client: pymongo.MongoClient, database_name: str, limit: i
     Returns a list of dicts with at least {'id': str, 'name': str}.
     """
     db = client[database_name]
-    if "metrics" not in db.list_collection_names():
+    if not has_collection(client, database_name, "metrics"):
         return []
     items: List[Dict] = []
     try:
@@ -136,28 +535,141 @@ def fetch_metrics_list(client: pymongo.MongoClient, database_name: str, limit: i
     return items
 
 
-def fetch_metrics_values_map(client: pymongo.MongoClient, database_name: str, id_strs: List[str]) -> Dict[str, Dict]:
-    """
-    Fetch metric values and steps for a list of metric IDs.
-    """
-    if not id_strs:
-        return {}
-    db = client[database_name]
-    if "metrics" not in db.list_collection_names():
-        return {}
+def _metric_object_ids(id_strs: List[str]) -> List[ObjectId]:
     object_ids = []
-    for s in id_strs:
+    for s in id_strs or []:
         try:
             object_ids.append(ObjectId(s))
         except Exception:
             continue
-    if not object_ids:
-        return {}
-    values_by_id: Dict[str, Dict] = {}
-    for doc in db["metrics"].find({"_id": {"$in": object_ids}}, {"values": 1, "steps": 1}):
-        values_by_id[str(doc.get("_id"))] = {
-            "values": doc.get("values", []),
-            "steps": doc.get("steps", []),
-        }
-    return values_by_id
+    return object_ids
+
+
+def _metric_payload(doc: Dict) -> Dict:
+    return {
+        "values": doc.get("values", []),
+        "steps": doc.get("steps", []),
+    }
+
+
+def _find_metrics_chunk(collection, object_ids: List[ObjectId]) -> Iterator[Dict]:
+    return collection.find({"_id": {"$in": object_ids}}, {"values": 1, "steps": 1})
+
+
+def _strided_metrics_chunk(collection, object_ids: List[ObjectId], target: int) -> Iterator[Dict]:
+    pipeline = [
+        {"$match": {"_id": {"$in": object_ids}}},
+        {"$project": {
+            "values": {"$ifNull": ["$values", []]},
+            "steps": {"$ifNull": ["$steps", []]},
+            "n": {"$size": {"$ifNull": ["$values", []]}},
+        }},
+        {"$project": {
+            "values": 1,
+            "steps": 1,
+            "idx": {"$range": [0, "$n", {"$max": [1, {"$toInt": {"$ceil": {"$divide": ["$n", target]}}}]}]},
+        }},
+        {"$project": {
+            "values": {"$map": {"input": "$idx", "as": "i", "in": {"$arrayElemAt": ["$values", "$$i"]}}},
+            "steps": {"$map": {"input": "$idx", "as": "i", "in": {"$ifNull": [{"$arrayElemAt": ["$steps", "$$i"]}, "$$i"]}}},
+        }},
+    ]
+    return collection.aggregate(pipeline, allowDiskUse=True)
+
+
+def _iter_metric_chunks(
+    client: pymongo.MongoClient,
+    database_name: str,
+    id_strs: List[str],
+    fetch_chunk: Callable,
+    chunk_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+) -> Iterator[Tuple[str, Dict]]:
+    """
+    Yield (metric_id, payload) pairs, querying the IDs in `$in` chunks.
+    With a concurrency above 1, that many chunks are in flight on the shared
+    query pool and their documents are yielded as each chunk completes.
+    """
+    if not id_strs or not has_collection(client, database_name, "metrics"):
+        return
+    object_ids = _metric_object_ids(id_strs)
+    size = max(int(chunk_size or METRICS_FETCH_CHUNK_SIZE), 1)
+    window = max(int(concurrency or METRICS_FETCH_CONCURRENCY), 1)
+    chunks = [object_ids[i:i + size] for i in range(0, len(object_ids), size)]
+    collection = client[database_name]["metrics"]
+
+    if window == 1 or len(chunks) == 1:
+        for chunk in chunks:
+            for doc in fetch_chunk(collection, chunk):
+                yield str(doc.get("_id")), _metric_payload(doc)
+        return
+
+    def run_chunk(chunk):
+        return [(str(doc.get("_id")), _metric_payload(doc)) for doc in fetch_chunk(collection, chunk)]
+
+    pending = set()
+    remaining = iter(chunks)
+    try:
+        for chunk in remaining:
+            pending.add(submit_query(run_chunk, chunk))
+            if len(pending) >= window:
+                break
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+                chunk = next(remaining, None)
+                if chunk is not None:
+                    pending.add(submit_query(run_chunk, chunk))
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def iter_metrics_values(
+    client: pymongo.MongoClient,
+    database_name: str,
+    id_strs: List[str],
+    chunk_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+) -> Iterator[Tuple[str, Dict]]:
+    """
+    Yield (metric_id, {"values", "steps"}) for a list of metric IDs, querying
+    them in chunks of METRICS_FETCH_CHUNK_SIZE IDs.
+    """
+    return _iter_metric_chunks(client, database_name, id_strs, _find_metrics_chunk, chunk_size, concurrency)
+
+
+def fetch_metrics_values_map(
+    client: pymongo.MongoClient,
+    database_name: str,
+    id_strs: List[str],
+    chunk_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+) -> Dict[str, Dict]:
+    """
+    Fetch metric values and steps for a list of metric IDs.
+    """
+    return dict(iter_metrics_values(client, database_name, id_strs, chunk_size, concurrency))
+
+
+def fetch_metrics_values_strided(
+    client: pymongo.MongoClient,
+    database_name: str,
+    id_strs: List[str],
+    target: int,
+    chunk_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+) -> Dict[str, Dict]:
+    """
+    Fetch metric values and steps keeping every Nth point, so that about
+    `target` points per series remain. The reduction runs in a MongoDB
+    projection, so full arrays never leave the database. Missing steps are
+    replaced by the point index, as for full series.
+    """
+    target = max(int(target), 1)
+
+    def fetch_chunk(collection, object_ids):
+        return _strided_metrics_chunk(collection, object_ids, target)
 
+    return dict(_iter_metric_chunks(client, database_name, id_strs, fetch_chunk, chunk_size, concurrency))
@@ -0,0 +1,97 @@
+"""
+Projection of run configs on the selected config keys.
+
+Sacred configs can embed large nested values (model architectures, dataset
+manifests), so runs are loaded with only the selected keys of their config.
+The session records those keys as "config_fields"; when more keys are
+selected, their values are fetched for the loaded runs and merged in.
+"""
+
+from typing import Any, Dict, Iterable, Optional
+import threading
+
+from .frame import drop_config_columns
+from .mongo import combine_queries, iter_runs_docs, runs_projection
+
+
+def config_fields_for(keys: Iterable[str]) -> Optional[frozenset]:
+    """
+    Return the config fields to load for `keys`, or None when the whole
+    config has to be loaded because a key cannot be projected.
+    """
+    fields = frozenset(k for k in keys or [] if isinstance(k, str) and k)
+    if any("." in k or k.startswith("$") for k in fields):
+        return None
+    return fields
+
+
+def session_projection(session: Dict) -> Dict:
+    """
+    Return the run projection matching the config fields loaded in a session.
+    """
+    return runs_projection(session.get("config_fields"))
+
+
+def _fetch_config_values(session: Dict, keys: Optional[frozenset], after_id: Any, upto_id: Any) -> Dict:
+    """
+    Return {run_id: config} of the session runs with _id in (after_id, upto_id],
+    projected on `keys` (the whole config when None).
+    """
+    query = combine_queries(session.get("query"), {"_id": {"$lte": upto_id}})
+    values = {}
+    for batch in iter_runs_docs(
+        session.get("client"), session.get("database_name"), after_id=after_id, query=query, projection=runs_projection(keys)
+    ):
+        for row in batch:
+            values[row.get("run_id")] = row.get("config") or {}
+    return values
+
+
+def ensure_config_fields(session: Dict, keys: Iterable[str]) -> None:
+    """
+    Make sure the loaded runs of a session carry the config values of `keys`.
+
+    Missing keys are fetched in one pass over the loaded runs, projected on
+    those keys only, without holding the load lock, so the batch loader keeps
+    running. The runs then get new config dicts swapped in under the load lock
+    (other callbacks may be reading the old ones), after fetching the keys of
+    any batch appended meanwhile, and later batches are loaded with the wider
+    projection. On errors the runs keep their current projection.
+    """
+    if not session or session.get("config_fields") is None:
+        return
+    wanted = frozenset(k for k in keys or [] if isinstance(k, str) and k)
+    if wanted <= session["config_fields"]:
+        return
+
+    # One fill per session at a time; callbacks firing together wait for it
+    with session.setdefault("fields_lock", threading.Lock()):
+        loaded = session.get("config_fields")
+        if loaded is None or wanted <= loaded:
+            return
+        missing = wanted - loaded
+        fields = config_fields_for(loaded | missing)
+        fetch_keys = missing if fields is not None else None
+        client = session.get("client")
+        last_id = session.get("last_id")
+        values = {}
+        try:
+            if client is not None and last_id is not None:
+                values = _fetch_config_values(session, fetch_keys, None, last_id)
+            with session.setdefault("load_lock", threading.Lock()):
+                # Batches appended during the fetch were loaded with the old projection
+                new_last_id = session.get("last_id")
+                if client is not None and new_last_id is not None and new_last_id != last_id:
+                    values.update(_fetch_config_values(session, fetch_keys, last_id, new_last_id))
+                for run in session.get("runs") or []:
+                    cfg = values.get(run.get("run_id"))
+                    if cfg:
+                        old = run.get("config")
+                        run["config"] = {**(old if isinstance(old, dict) else {}), **cfg}
+                session["config_fields"] = fields
+        except Exception:
+            return
+        # Cached columns, masks and statistics of the new keys were built from
+        # runs without those values
+        drop_config_columns(session, fetch_keys)
+        session.pop("pushdown", None)
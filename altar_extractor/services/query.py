@@ -0,0 +1,231 @@
+"""
+Server-side query layer for the experiments table.
+
+Applies the DataTable `filter_query` / `sort_by` properties and pagination to
+config-filtered runs from the run store, so only the visible page is turned
+into table rows.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import math
+import random
+
+FILTER_OPERATORS = [
+    ["ge ", ">="],
+    ["le ", "<="],
+    ["lt ", "<"],
+    ["gt ", ">"],
+    ["ne ", "!="],
+    ["eq ", "="],
+    ["contains "],
+    ["datestartswith "],
+]
+
+
+def run_id_sort_key(run: Dict):
+    """
+    Sort key ordering Sacred run IDs numerically when possible.
+    """
+    rid = str(run.get("run_id", ""))
+    try:
+        return int(rid)
+    except Exception:
+        pass
+    try:
+        if len(rid) == 24:
+            return int(rid, 16)
+    except Exception:
+        pass
+    return rid
+
+
+def order_runs(runs: List[Dict], random_seed: Optional[str] = None) -> List[Dict]:
+    """
+    Return runs ordered by run ID, or shuffled when a random seed is given.
+    The seed keeps the shuffled order stable across page changes.
+    """
+    ordered = list(runs)
+    if random_seed is not None and len(ordered) > 1:
+        random.Random(random_seed).shuffle(ordered)
+        return ordered
+    try:
+        ordered.sort(key=run_id_sort_key)
+    except Exception:
+        pass
+    return ordered
+
+
+def run_column_value(run: Dict, col_id: str) -> Any:
+    """
+    Return the raw value a run has for a table column ID.
+    """
+    if col_id in ("run_id", "experiment"):
+        return run.get(col_id, "")
+    if col_id.startswith("result:"):
+        r = run.get("result", None)
+        return r.get(col_id[len("result:"):], None) if isinstance(r, dict) else None
+    cfg = run.get("config", {}) or {}
+    return cfg.get(col_id) if isinstance(cfg, dict) else None
+
+
+def split_filter_part(filter_part: str) -> Tuple[Optional[str], Optional[str], Any]:
+    """
+    Split one `{column} op value` clause of a DataTable filter_query.
+    """
+    for operator_type in FILTER_OPERATORS:
+        for operator in operator_type:
+            if operator not in filter_part:
+                continue
+            name_part, value_part = filter_part.split(operator, 1)
+            name = name_part[name_part.find("{") + 1: name_part.rfind("}")]
+
+            value_part = value_part.strip()
+            v0 = value_part[0] if value_part else ""
+            if value_part and v0 == value_part[-1] and v0 in ("'", '"', "`"):
+                value = value_part[1:-1].replace("\\" + v0, v0)
+            else:
+                try:
+                    value = float(value_part)
+                except ValueError:
+                    value = value_part
+
+            # word operators need spaces after them in the filter string,
+            # but we don't want these later
+            return name, operator_type[0].strip(), value
+    return None, None, None
+
+
+def parse_filter_query(filter_query: Optional[str]) -> List[Tuple[str, str, Any]]:
+    """
+    Parse a DataTable filter_query into (column_id, operator, value) clauses.
+    """
+    clauses: List[Tuple[str, str, Any]] = []
+    for part in (filter_query or "").split(" && "):
+        if not part.strip():
+            continue
+        col_id, op, value = split_filter_part(part)
+        if col_id and op:
+            clauses.append((col_id, op, value))
+    return clauses
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _as_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (list, dict)):
+        try:
+            return json.dumps(value, ensure_ascii=False, default=str)
+        except Exception:
+            return str(value)
+    return str(value)
+
+
+def value_matches(value: Any, op: str, target: Any) -> bool:
+    """
+    Evaluate a single DataTable filter clause against a raw cell value.
+    """
+    if op == "contains":
+        return _as_text(target).lower() in _as_text(value).lower()
+    if op == "datestartswith":
+        return _as_text(value).startswith(_as_text(target))
+
+    if _is_number(target) and _is_number(value):
+        left, right = value, target
+    elif _is_number(target):
+        try:
+            left, right = float(_as_text(value)), target
+        except ValueError:
+            left, right = _as_text(value), _as_text(target)
+    else:
+        left, right = _as_text(value), _as_text(target)
+
+    try:
+        if op == "eq":
+            return left == right
+        if op == "ne":
+            return left != right
+        if op == "lt":
+            return left < right
+        if op == "le":
+            return left <= right
+        if op == "gt":
+            return left > right
+        if op == "ge":
+            return left >= right
+    except TypeError:
+        return False
+    return True
+
+
+def apply_filter_query(runs: List[Dict], filter_query: Optional[str]) -> List[Dict]:
+    """
+    Keep the runs matching every clause of a DataTable filter_query.
+    """
+    clauses = parse_filter_query(filter_query)
+    if not clauses:
+        return runs
+    return [
+        run for run in runs
+        if all(value_matches(run_column_value(run, col_id), op, target) for col_id, op, target in clauses)
+    ]
+
+
+def _sort_value(value: Any) -> Tuple:
+    if _is_number(value):
+        return (0, value, "")
+    return (1, 0, _as_text(value))
+
+
+def apply_sort_by(runs: List[Dict], sort_by: Optional[List[Dict]]) -> List[Dict]:
+    """
+    Sort runs following a DataTable sort_by list; empty cells always go last.
+    """
+    ordered = list(runs)
+    for spec in reversed(sort_by or []):
+        col_id = spec.get("column_id") if isinstance(spec, dict) else None
+        if not col_id:
+            continue
+        descending = spec.get("direction") == "desc"
+        present = [r for r in ordered if run_column_value(r, col_id) not in (None, "")]
+        missing = [r for r in ordered if run_column_value(r, col_id) in (None, "")]
+        present.sort(key=lambda r: _sort_value(run_column_value(r, col_id)), reverse=descending)
+        ordered = present + missing
+    return ordered
+
+
+def query_experiment_runs(
+    filtered_runs: List[Dict],
+    random_seed: Optional[str] = None,
+    sort_by: Optional[List[Dict]] = None,
+    filter_query: Optional[str] = None,
+) -> List[Dict]:
+    """
+    Return the config-filtered runs shown by the experiments table, in display order.
+    """
+    ordered = order_runs(filtered_runs, random_seed)
+    ordered = apply_filter_query(ordered, filter_query)
+    return apply_sort_by(ordered, sort_by)
+
+
+def paginate(items: List, page_current: Optional[int], page_size: Optional[int]) -> Tuple[List, int, int]:
+    """
+    Return (page_items, page_current, page_count), clamping the page index.
+    """
+    try:
+        size = int(page_size)
+    except Exception:
+        size = 10
+    size = size if size > 0 else 10
+    page_count = max(math.ceil(len(items) / size), 1)
+    try:
+        current = int(page_current or 0)
+    except Exception:
+        current = 0
+    current = min(max(current, 0), page_count - 1)
+    start = current * size
+    return items[start:start + size], current, page_count
@@ -3,6 +3,56 @@ State management for AltarExtractor.
 """
 
 from .cache import PYGWALKER_CACHE
+from .metrics_cache import METRICS_CACHE, MetricSeriesCache
+from .runs import (
+    RUN_STORE,
+    create_session,
+    get_session,
+    get_runs,
+    session_handle,
+    bump_version,
+    append_runs,
+    merge_runs,
+    drop_session,
+    find_sessions,
+)
+from .clients import (
+    MONGO_CLIENTS,
+    client_key,
+    registry_key,
+    get_client,
+    release_client,
+    close_unused_client,
+    close_all_clients,
+)
+from .exports import (
+    EXPORTS,
+    register_export,
+    get_export,
+)
 
-__all__ = ["PYGWALKER_CACHE"]
-
+__all__ = [
+    "PYGWALKER_CACHE",
+    "METRICS_CACHE",
+    "MetricSeriesCache",
+    "RUN_STORE",
+    "create_session",
+    "get_session",
+    "get_runs",
+    "session_handle",
+    "bump_version",
+    "append_runs",
+    "merge_runs",
+    "drop_session",
+    "find_sessions",
+    "MONGO_CLIENTS",
+    "client_key",
+    "registry_key",
+    "get_client",
+    "release_client",
+    "close_unused_client",
+    "close_all_clients",
+    "EXPORTS",
+    "register_export",
+    "get_export",
+]
@@ -1,9 +1,475 @@
 """
-In-memory cache for sharing data between routes.
+Dataset cache for sharing data between callbacks and the Pygwalker route.
+
+Datasets are stored as Arrow IPC files in a pluggable backend:
+- "memory": a dict in the current process
+- "disk": files in a directory shared by every worker on the host
+- "redis": any Redis-compatible server (needs the optional `redis` package)
+
+The disk and Redis backends let a `/pygwalker?id=...` request be served by a
+different worker than the one that stored the dataset. The files are written
+uncompressed so the route can memory-map them instead of rebuilding the
+DataFrame from Python objects. Windows cannot delete or replace a mapped
+file, so there they are read into memory instead.
+
+Datasets are keyed by a hash of their content, so reopening the same view
+reuses the stored entry. Entries not opened for PYGWALKER_CACHE_TTL seconds
+expire, and the least recently opened ones are evicted once the stored blobs
+exceed PYGWALKER_CACHE_MAX_BYTES. The rendered Pygwalker page of a dataset is
+stored gzip-compressed next to it, so reloading the page skips rendering.
 """
 
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple, Union
+import gzip
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+
+from ..config import (
+    PYGWALKER_CACHE_BACKEND,
+    PYGWALKER_CACHE_DIR,
+    PYGWALKER_CACHE_MAX_BYTES,
+    PYGWALKER_CACHE_TTL,
+    PYGWALKER_CACHE_URL,
+)
+
+# Dataset keys become file names and Redis keys, so only allow plain tokens
+_KEY_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,128}$")
+
+
+def valid_key(key: str) -> bool:
+    """
+    Return True if `key` can be used as a dataset key.
+    """
+    return isinstance(key, str) and bool(_KEY_PATTERN.match(key))
+
+
+Dataset = Union[pa.Table, pd.DataFrame, Dict[str, List], List[Dict]]
+
+_ARROW_ERRORS = (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, TypeError, ValueError)
+
+
+def _arrow_column(values: List) -> pa.Array:
+    """
+    Convert one column of Python values to Arrow. Columns mixing types (config
+    values, "" placeholders in numeric tables) become nullable or strings.
+    """
+    try:
+        return pa.array(values)
+    except _ARROW_ERRORS:
+        pass
+    try:
+        return pa.array([None if v == "" else v for v in values])
+    except _ARROW_ERRORS:
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+
+def dataset_table(data: Dataset) -> pa.Table:
+    """
+    Return a dataset as an Arrow table. Accepts a table, a DataFrame, a dict of
+    equally long column lists or a list of row dicts.
+    """
+    if isinstance(data, pa.Table):
+        return data
+    if isinstance(data, pd.DataFrame):
+        try:
+            return pa.Table.from_pandas(data, preserve_index=False)
+        except _ARROW_ERRORS:
+            data = {str(col): data[col].tolist() for col in data.columns}
+    if isinstance(data, dict):
+        return pa.table({str(col): _arrow_column(list(values)) for col, values in data.items()})
+    rows = data or []
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    return pa.table({str(col): _arrow_column([row.get(col) for row in rows]) for col in columns})
+
+
+def serialize_dataset(data: Dataset) -> bytes:
+    """
+    Encode a dataset as an Arrow IPC file.
+    """
+    table = dataset_table(data)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def deserialize_dataset(source) -> pa.Table:
+    """
+    Decode an Arrow IPC file from bytes or a memory-mapped file.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = pa.py_buffer(source)
+    return pa.ipc.open_file(source).read_all()
+
+
+def html_key(key: str) -> str:
+    """
+    Return the key of the rendered page of a dataset.
+    """
+    return f"{key}-html"
+
+
+def dataset_key(blob: bytes) -> str:
+    """
+    Return the content key of a serialized dataset.
+    """
+    return hashlib.sha256(blob).hexdigest()[:32]
+
+
+class MemoryBackend:
+    """Blobs in a dict of the current process."""
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[bytes, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(key)
+            return entry[0] if entry else None
+
+    def set(self, key: str, blob: bytes) -> None:
+        with self._lock:
+            self._data[key] = (blob, time.time())
+
+    def open(self, key: str):
+        return self.get(key)
+
+    def touch(self, key: str) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return False
+            self._data[key] = (entry[0], time.time())
+            return True
+
+    def atime(self, key: str) -> Optional[float]:
+        with self._lock:
+            entry = self._data.get(key)
+            return entry[1] if entry else None
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def entries(self) -> List[Tuple[str, int, float]]:
+        with self._lock:
+            return [(key, len(blob), atime) for key, (blob, atime) in self._data.items()]
+
+
+class DirectoryBackend:
+    """Blobs as files in a directory shared by all workers."""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.bin")
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._file(key), "rb") as fh:
+                return fh.read()
+        except OSError:
+            return None
+
+    def open(self, key: str):
+        if os.name == "nt":
+            return self.get(key)
+        try:
+            return pa.memory_map(self._file(key), "r")
+        except OSError:
+            return None
+
+    def set(self, key: str, blob: bytes) -> None:
+        # Write then rename, so readers in other workers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(blob)
+            os.replace(tmp_path, self._file(key))
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def touch(self, key: str) -> bool:
+        # The file mtime doubles as the last access time
+        try:
+            os.utime(self._file(key))
+            return True
+        except OSError:
+            return False
+
+    def atime(self, key: str) -> Optional[float]:
+        try:
+            return os.stat(self._file(key)).st_mtime
+        except OSError:
+            return None
+
+    def delete(self, key: str) -> bool:
+        try:
+            os.remove(self._file(key))
+            return True
+        except OSError:
+            return False
+
+    def entries(self) -> List[Tuple[str, int, float]]:
+        found: List[Tuple[str, int, float]] = []
+        try:
+            with os.scandir(self.path) as it:
+                for entry in it:
+                    if not entry.name.endswith(".bin"):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    found.append((entry.name[:-4], st.st_size, st.st_mtime))
+        except OSError:
+            pass
+        return found
+
+
+class RedisBackend:
+    """
+    Blobs in a Redis-compatible server. Access times and sizes are kept in a
+    sorted set and a hash next to the blobs; blobs expire natively after
+    `ttl` seconds without access.
+    """
+
+    def __init__(self, url: str, ttl: float = 0, prefix: str = "altar_extractor:pygwalker:"):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self.ttl = int(ttl) if ttl and ttl > 0 else None
+        self.prefix = prefix
+        self._atimes = prefix + "__atime"
+        self._sizes = prefix + "__size"
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(self.prefix + key)
+
+    def open(self, key: str):
+        return self.get(key)
+
+    def set(self, key: str, blob: bytes) -> None:
+        pipe = self._client.pipeline()
+        pipe.set(self.prefix + key, blob, ex=self.ttl)
+        pipe.zadd(self._atimes, {key: time.time()})
+        pipe.hset(self._sizes, key, len(blob))
+        pipe.execute()
+
+    def touch(self, key: str) -> bool:
+        if self.ttl:
+            alive = self._client.expire(self.prefix + key, self.ttl)
+        else:
+            alive = self._client.exists(self.prefix + key)
+        if not alive:
+            return False
+        self._client.zadd(self._atimes, {key: time.time()})
+        return True
+
+    def atime(self, key: str) -> Optional[float]:
+        score = self._client.zscore(self._atimes, key)
+        return float(score) if score is not None else None
+
+    def delete(self, key: str) -> bool:
+        pipe = self._client.pipeline()
+        pipe.delete(self.prefix + key)
+        pipe.zrem(self._atimes, key)
+        pipe.hdel(self._sizes, key)
+        return bool(pipe.execute()[0])
+
+    def entries(self) -> List[Tuple[str, int, float]]:
+        if self.ttl:
+            # Blobs past their TTL were expired by the server; drop their bookkeeping
+            expired = self._client.zrangebyscore(self._atimes, "-inf", time.time() - self.ttl)
+            if expired:
+                pipe = self._client.pipeline()
+                pipe.zrem(self._atimes, *expired)
+                pipe.hdel(self._sizes, *expired)
+                pipe.execute()
+        sizes = self._client.hgetall(self._sizes)
+        found: List[Tuple[str, int, float]] = []
+        for key, atime in self._client.zrange(self._atimes, 0, -1, withscores=True):
+            key = key.decode() if isinstance(key, bytes) else key
+            size = sizes.get(key.encode()) or sizes.get(key) or 0
+            found.append((key, int(size), float(atime)))
+        return found
+
+
+def make_backend(name: str, ttl: float = 0):
+    """
+    Create the backend named by PYGWALKER_CACHE_BACKEND.
+    Falls back to the shared directory when the `redis` package is missing.
+    """
+    name = (name or "memory").strip().lower()
+    if name == "redis":
+        try:
+            return RedisBackend(PYGWALKER_CACHE_URL, ttl=ttl)
+        except ImportError:
+            name = "disk"
+    if name == "disk":
+        return DirectoryBackend(PYGWALKER_CACHE_DIR)
+    return MemoryBackend()
+
+
+class DatasetCache:
+    """
+    Dataset store: `cache.add(data)` stores a dataset and returns its key,
+    `cache.table(key)` returns it as an Arrow table and `cache.get(key)` as a
+    DataFrame.
+    """
+
+    def __init__(self, backend, ttl: float, max_bytes: int):
+        self.backend = backend
+        self.ttl = max(float(ttl), 0.0)
+        self.max_bytes = max(int(max_bytes), 0)
+        self.evictions = 0
+
+    def add(self, data: Dataset) -> str:
+        """
+        Store a dataset and return its key. An identical dataset already in
+        the cache is reused instead of stored again.
+        """
+        blob = serialize_dataset(data)
+        key = dataset_key(blob)
+        if not self.backend.touch(key):
+            self.backend.set(key, blob)
+        self.prune(keep=key)
+        return key
+
+    def __setitem__(self, key: str, data: Dataset) -> None:
+        if not valid_key(key):
+            raise KeyError(key)
+        self.backend.set(key, serialize_dataset(data))
+        self.prune(keep=key)
+
+    def prune(self, keep: Optional[str] = None) -> None:
+        """
+        Drop expired entries, then the least recently opened ones until the
+        stored blobs fit in `max_bytes`. A dataset is dropped together with
+        its rendered page. `keep` and its dataset or page are never evicted.
+        """
+        now = time.time()
+        entries = self.backend.entries()
+        sizes = {key: size for key, size, _ in entries}
+        protected = set()
+        if keep:
+            protected = {keep, keep[:-len("-html")] if keep.endswith("-html") else html_key(keep)}
+        removed = set()
+
+        def evict(key: str) -> int:
+            freed = 0
+            for target in ([key] if key.endswith("-html") else [key, html_key(key)]):
+                if target in sizes and target not in removed and self.backend.delete(target):
+                    removed.add(target)
+                    freed += sizes[target]
+            if key in removed:
+                self.evictions += 1
+            return freed
+
+        for key, _, atime in entries:
+            if key in protected or key in removed:
+                continue
+            orphan_page = key.endswith("-html") and key[:-len("-html")] not in sizes
+            if orphan_page or (self.ttl and now - atime > self.ttl):
+                evict(key)
+        total = sum(size for key, size in sizes.items() if key not in removed)
+        for key, _, _ in sorted(entries, key=lambda entry: entry[2]):
+            if total <= self.max_bytes:
+                break
+            if key in protected or key in removed:
+                continue
+            total -= evict(key)
+
+    def _expired(self, key: str) -> bool:
+        if not self.ttl:
+            return False
+        atime = self.backend.atime(key)
+        return atime is not None and time.time() - atime > self.ttl
+
+    def table(self, key: str) -> Optional[pa.Table]:
+        """
+        Return the Arrow table of a dataset, memory-mapped when the backend
+        stores files, or None if it is missing or expired.
+        """
+        if not valid_key(key):
+            return None
+        source = self.backend.open(key)
+        if source is None:
+            return None
+        try:
+            if self._expired(key):
+                if hasattr(source, "close"):
+                    source.close()
+                if self.backend.delete(key):
+                    self.evictions += 1
+                return None
+            self.backend.touch(key)
+            return deserialize_dataset(source)
+        except Exception:
+            return None
+        finally:
+            # The table keeps the mapped region alive; the file handle is not needed
+            if hasattr(source, "close"):
+                source.close()
+
+    def get(self, key: str, default=None) -> Optional[pd.DataFrame]:
+        table = self.table(key)
+        if table is None:
+            return default
+        return table.to_pandas()
+
+    def get_html(self, key: str) -> Optional[bytes]:
+        """
+        Return the gzip-compressed rendered page of a dataset, if stored and
+        its dataset has not expired or been evicted.
+        """
+        if not valid_key(key):
+            return None
+        page = html_key(key)
+        if key not in self or self._expired(page):
+            if self.backend.delete(page):
+                self.evictions += 1
+            return None
+        if not self.backend.touch(page):
+            return None
+        # Viewing the page counts as opening the dataset
+        self.backend.touch(key)
+        return self.backend.get(page)
+
+    def set_html(self, key: str, html: str) -> bytes:
+        """
+        Store the rendered page of a dataset and return it gzip-compressed.
+        """
+        blob = gzip.compress(html.encode("utf-8"), compresslevel=6, mtime=0)
+        if valid_key(key):
+            self.backend.set(html_key(key), blob)
+            self.prune(keep=html_key(key))
+        return blob
+
+    def __contains__(self, key: str) -> bool:
+        return valid_key(key) and self.backend.atime(key) is not None and not self._expired(key)
+
+    def __delitem__(self, key: str) -> None:
+        if valid_key(key):
+            self.backend.delete(key)
+            self.backend.delete(html_key(key))
 
-# Simple in-memory cache to pass data to the pygwalker page
-PYGWALKER_CACHE: Dict[str, List[Dict]] = {}
 
+# Datasets passed to the pygwalker page
+PYGWALKER_CACHE = DatasetCache(
+    make_backend(PYGWALKER_CACHE_BACKEND, PYGWALKER_CACHE_TTL), PYGWALKER_CACHE_TTL, PYGWALKER_CACHE_MAX_BYTES
+)
@@ -0,0 +1,140 @@
+"""
+Process-wide registry of pooled MongoDB clients.
+
+Clients are keyed by a hash of the connection URI, so reconnecting to the same
+cluster with the same credentials reuses the existing connection pool and only
+costs a ping. Idle clients stay registered until they are evicted as the least
+recently used beyond MONGO_MAX_CLIENTS, or closed explicitly when a session
+switches credentials. `get_client` leases a client to the calling request
+until it calls `release_client`; leased clients and clients of stored sessions
+are never closed.
+"""
+
+from collections import Counter, OrderedDict
+from typing import Optional, Tuple
+import atexit
+import hashlib
+import threading
+
+import pymongo
+
+from ..config import (
+    MONGO_MAX_CLIENTS,
+    MONGO_MAX_IDLE_TIME_MS,
+    MONGO_MAX_POOL_SIZE,
+    MONGO_MIN_POOL_SIZE,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS,
+)
+from .runs import find_sessions
+
+# uri hash -> client, least recently used first
+MONGO_CLIENTS: "OrderedDict[str, pymongo.MongoClient]" = OrderedDict()
+# uri hash -> requests currently holding the client from get_client
+_LEASES: Counter = Counter()
+_LOCK = threading.Lock()
+
+
+def client_key(uri: str) -> str:
+    """
+    Return the registry key of a connection URI. The URI itself may contain
+    credentials and is never kept.
+    """
+    return hashlib.sha256((uri or "").encode("utf-8")).hexdigest()
+
+
+def registry_key(client: pymongo.MongoClient) -> str:
+    """
+    Return the registry key of a pooled client, for caches that must not be
+    shared between credentials. Clients outside the registry get a key of
+    their own.
+    """
+    with _LOCK:
+        for key, other in MONGO_CLIENTS.items():
+            if other is client:
+                return key
+    return f"client-{id(client)}"
+
+
+def _client_in_use(key: str) -> bool:
+    return _LEASES[key] > 0 or len(find_sessions(client_key=key)) > 0
+
+
+def get_client(uri: str) -> Tuple[str, pymongo.MongoClient]:
+    """
+    Return (key, client) for a URI, creating a pooled client on first use.
+    The client is leased to the caller, who must call `release_client(key)`
+    once done or once the client is stored in a session. The client is not
+    pinged; callers check connectivity themselves.
+    """
+    key = client_key(uri)
+    evicted = []
+    with _LOCK:
+        client = MONGO_CLIENTS.get(key)
+        if client is None:
+            client = pymongo.MongoClient(
+                uri,
+                serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                maxPoolSize=MONGO_MAX_POOL_SIZE,
+                minPoolSize=MONGO_MIN_POOL_SIZE,
+                maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+            )
+            MONGO_CLIENTS[key] = client
+        MONGO_CLIENTS.move_to_end(key)
+        _LEASES[key] += 1
+        # Drop the least recently used idle clients beyond the limit
+        for other in list(MONGO_CLIENTS):
+            if len(MONGO_CLIENTS) - len(evicted) <= max(MONGO_MAX_CLIENTS, 1):
+                break
+            if other != key and not _client_in_use(other):
+                evicted.append(other)
+        evicted_clients = [MONGO_CLIENTS.pop(other) for other in evicted]
+    for old in evicted_clients:
+        old.close()
+    return key, client
+
+
+def release_client(key: Optional[str]) -> None:
+    """
+    Return a lease taken with `get_client`. The client stays registered for
+    the next request with the same URI.
+    """
+    if not key:
+        return
+    with _LOCK:
+        if _LEASES[key] > 0:
+            _LEASES[key] -= 1
+        if _LEASES[key] <= 0:
+            _LEASES.pop(key, None)
+
+
+def close_unused_client(key: Optional[str]) -> None:
+    """
+    Close and forget the client for `key` unless a request holds a lease on it
+    or a stored session still uses it.
+    """
+    if not key:
+        return
+    with _LOCK:
+        if _client_in_use(key):
+            return
+        client = MONGO_CLIENTS.pop(key, None)
+    if client is not None:
+        client.close()
+
+
+def close_all_clients() -> None:
+    """
+    Close every registered client.
+    """
+    with _LOCK:
+        clients = list(MONGO_CLIENTS.values())
+        MONGO_CLIENTS.clear()
+        _LEASES.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception:
+            pass
+
+
+atexit.register(close_all_clients)
@@ -0,0 +1,50 @@
+"""
+Pending CSV exports.
+
+A download callback records what to export (session handle, filters, table
+options) under a random ID and hands the browser a URL with that ID; the
+download route then generates the CSV from the run store.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import threading
+import time
+import uuid
+
+# Seconds an export URL stays valid
+EXPORT_TTL_S = 600
+
+# Pending exports kept at most
+EXPORT_MAX_PENDING = 64
+
+# export id -> (created at, export spec), oldest first
+EXPORTS: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+_LOCK = threading.Lock()
+
+
+def register_export(spec: Dict) -> str:
+    """
+    Record an export and return its ID.
+    """
+    export_id = uuid.uuid4().hex
+    now = time.time()
+    with _LOCK:
+        EXPORTS[export_id] = (now, spec)
+        while EXPORTS:
+            oldest_id, (created, _) = next(iter(EXPORTS.items()))
+            if len(EXPORTS) <= EXPORT_MAX_PENDING and now - created <= EXPORT_TTL_S:
+                break
+            EXPORTS.pop(oldest_id)
+    return export_id
+
+
+def get_export(export_id: str) -> Optional[Dict]:
+    """
+    Return the spec of a pending export, or None if unknown or expired.
+    """
+    with _LOCK:
+        entry = EXPORTS.get(export_id or "")
+    if entry is None or time.time() - entry[0] > EXPORT_TTL_S:
+        return None
+    return entry[1]
@@ -0,0 +1,94 @@
+"""
+Process-wide LRU cache for metric series.
+
+Sacred metric documents never change once their run has finished, so their
+values/steps are kept here keyed by client, database and metric ObjectId. The cache is bounded by
+the total number of stored points (values + steps) rather than by entry count.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+import threading
+
+from ..config import METRICS_CACHE_MAX_POINTS
+
+
+def series_points(payload: Dict) -> int:
+    """
+    Size of a metric payload in points (values + steps).
+    """
+    return len(payload.get("values") or []) + len(payload.get("steps") or [])
+
+
+class MetricSeriesCache:
+    """
+    Thread-safe LRU of {"values": [...], "steps": [...]} payloads with
+    hit/miss/eviction counters.
+    """
+
+    def __init__(self, max_points: int):
+        self.max_points = max(int(max_points), 0)
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._points = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, metric_id: str) -> Optional[Dict]:
+        with self._lock:
+            payload = self._entries.get(metric_id)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(metric_id)
+            self.hits += 1
+            return payload
+
+    def get_many(self, metric_ids: Iterable[str]) -> Dict[str, Dict]:
+        found: Dict[str, Dict] = {}
+        for metric_id in metric_ids:
+            payload = self.get(metric_id)
+            if payload is not None:
+                found[metric_id] = payload
+        return found
+
+    def put(self, metric_id: str, payload: Dict) -> None:
+        size = series_points(payload)
+        if size > self.max_points:
+            return
+        with self._lock:
+            previous = self._entries.pop(metric_id, None)
+            if previous is not None:
+                self._points -= series_points(previous)
+            self._entries[metric_id] = payload
+            self._points += size
+            while self._points > self.max_points and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._points -= series_points(evicted)
+                self.evictions += 1
+
+    def invalidate(self, metric_id: str) -> None:
+        with self._lock:
+            previous = self._entries.pop(metric_id, None)
+            if previous is not None:
+                self._points -= series_points(previous)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._points = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "points": self._points,
+                "max_points": self.max_points,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+METRICS_CACHE = MetricSeriesCache(METRICS_CACHE_MAX_POINTS)
@@ -0,0 +1,143 @@
+"""
+Server-side store for loaded Sacred runs.
+
+The browser only keeps a small handle in the ``runs-cache`` store
+(``{"token": ..., "version": ..., "count": ...}``); callbacks use it to look
+the runs up in process memory instead of receiving them on every request.
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import threading
+import uuid
+
+from ..config import RUN_STORE_MAX_SESSIONS
+
+# token -> session entry, least recently used first
+RUN_STORE: "OrderedDict[str, Dict]" = OrderedDict()
+_LOCK = threading.RLock()
+
+
+def session_handle(session: Dict) -> Dict:
+    """
+    Return the small JSON handle stored in the browser for a session.
+    """
+    return {
+        "token": session.get("token"),
+        "version": session.get("version", 0),
+        "count": len(session.get("runs") or []),
+    }
+
+
+def create_session(runs: List[Dict], **extra) -> Dict:
+    """
+    Store a list of runs under a new session token and return the session entry.
+    Extra keyword arguments are kept on the entry for later callbacks.
+    """
+    token = uuid.uuid4().hex
+    session = {
+        "token": token,
+        "version": 1,
+        "runs": list(runs or []),
+    }
+    session.update(extra)
+    with _LOCK:
+        RUN_STORE[token] = session
+        while len(RUN_STORE) > max(RUN_STORE_MAX_SESSIONS, 1):
+            RUN_STORE.popitem(last=False)
+    return session
+
+
+def get_session(handle) -> Optional[Dict]:
+    """
+    Look up a session entry from a browser handle (or a bare token).
+    Returns None when the handle is empty or the session has been evicted.
+    """
+    token = handle.get("token") if isinstance(handle, dict) else handle
+    if not isinstance(token, str) or not token:
+        return None
+    with _LOCK:
+        session = RUN_STORE.get(token)
+        if session is not None:
+            RUN_STORE.move_to_end(token)
+        return session
+
+
+def find_sessions(**fields) -> List[Dict]:
+    """
+    Return the stored sessions whose entries have all the given field values.
+    """
+    with _LOCK:
+        return [
+            session for session in RUN_STORE.values()
+            if all(session.get(name) == value for name, value in fields.items())
+        ]
+
+
+def get_runs(handle) -> List[Dict]:
+    """
+    Return the runs stored for a handle, or an empty list.
+    """
+    session = get_session(handle)
+    if session is None:
+        return []
+    return session.get("runs") or []
+
+
+def bump_version(session: Dict) -> Dict:
+    """
+    Mark a session as changed so that callbacks depending on its handle re-run.
+    Returns the new handle.
+    """
+    with _LOCK:
+        session["version"] = int(session.get("version", 0)) + 1
+    return session_handle(session)
+
+
+def append_runs(session: Dict, runs: List[Dict], bump: bool = True, **updates) -> Dict:
+    """
+    Append a batch of runs to a session, apply extra field updates and, unless
+    `bump` is False, bump its version. Returns the (new) handle.
+    """
+    with _LOCK:
+        session.setdefault("runs", []).extend(runs or [])
+        session.update(updates)
+    if not bump:
+        return session_handle(session)
+    return bump_version(session)
+
+
+def merge_runs(session: Dict, runs: List[Dict], **updates) -> Tuple[Dict, List[Tuple[int, Dict]]]:
+    """
+    Merge refreshed runs into a session: runs already stored (same run_id) are
+    replaced in place, the others are appended. Applies extra field updates and
+    bumps the version. Returns (handle, [(index, previous_run), ...]).
+    """
+    replaced: List[Tuple[int, Dict]] = []
+    with _LOCK:
+        stored = session.setdefault("runs", [])
+        index = session.get("run_index")
+        if index is None or len(index) != len(stored):
+            index = {run.get("run_id"): i for i, run in enumerate(stored)}
+        for run in runs or []:
+            i = index.get(run.get("run_id"))
+            if i is None:
+                index[run.get("run_id")] = len(stored)
+                stored.append(run)
+            else:
+                replaced.append((i, stored[i]))
+                stored[i] = run
+        session["run_index"] = index
+        session.update(updates)
+    return bump_version(session), replaced
+
+
+def drop_session(handle) -> None:
+    """
+    Remove a session from the store, if present.
+    """
+    token = handle.get("token") if isinstance(handle, dict) else handle
+    if not isinstance(token, str):
+        return
+    with _LOCK:
+        RUN_STORE.pop(token, None)
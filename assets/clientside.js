@@ -12,6 +12,16 @@ window.dash_clientside = Object.assign({}, window.dash_clientside, {
       }
       return "";
     }
+  },
+  download: {
+    start: function(url) {
+      if (!url) {
+        return window.dash_clientside.no_update;
+      }
+      // The route answers with an attachment, so the page stays in place
+      window.location.assign(url);
+      return "";
+    }
   }
 });
 
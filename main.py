@@ -5,7 +5,9 @@ Main entry point for the application.
 """
 
 import os
+from flask import jsonify
 from altar_extractor import create_app
+from altar_extractor.config import METRICS_CACHE_STATS_ROUTE
 from altar_extractor.components.layout import build_layout
 from altar_extractor.callbacks.connection import register_connection_callbacks
 from altar_extractor.callbacks.ui import register_ui_callbacks
@@ -13,6 +15,8 @@ from altar_extractor.callbacks.filters import register_filters_callbacks
 from altar_extractor.callbacks.experiments import register_experiments_callbacks
 from altar_extractor.callbacks.metrics import register_metrics_callbacks
 from altar_extractor.callbacks.pygwalker import register_pygwalker
+from altar_extractor.callbacks.indexes import register_index_callbacks
+from altar_extractor.state.metrics_cache import METRICS_CACHE
 
 
 def create_and_configure_app():
@@ -27,6 +31,13 @@ def create_and_configure_app():
     register_experiments_callbacks(app)
     register_metrics_callbacks(app)
     register_pygwalker(app, server)
+    register_index_callbacks(app)
+
+    # Hit/miss/eviction counters of the metric series cache, for sizing it
+    if METRICS_CACHE_STATS_ROUTE:
+        @server.route("/metrics-cache/stats")
+        def metrics_cache_stats_route():
+            return jsonify(METRICS_CACHE.stats())
     
     return app, server
 